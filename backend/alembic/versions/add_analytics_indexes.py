@@ -0,0 +1,46 @@
+"""add indexes for deals/activities/clients access paths
+
+Revision ID: add_analytics_indexes
+Revises: add_deal_analytics_columns
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_analytics_indexes'
+down_revision = 'add_deal_analytics_columns'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial predicate)
+INDEXES = [
+    ('ix_deals_client_status_created', 'deals', 'client_id, status, created_at', None),
+    ('ix_deals_product_category', 'deals', 'product_category', None),
+    ('ix_deals_product_id', 'deals', 'product_id', None),
+    ('ix_deals_owner_id', 'deals', 'owner_id', None),
+    # Won-only indexes back the windowed self-joins in statistics/seasonal.py
+    ('ix_deals_won_client_created', 'deals', 'client_id, created_at', "status = 'won'"),
+    ('ix_deals_won_category_created', 'deals', 'product_category, created_at', "status = 'won'"),
+    ('ix_activities_deal_id', 'activities', 'deal_id', None),
+    ('ix_activities_created_at', 'activities', 'created_at', None),
+    ('ix_clients_owner_id', 'clients', 'owner_id', None),
+]
+
+def _concurrently() -> str:
+    # Build without blocking writes where the backend supports it
+    return "CONCURRENTLY " if op.get_bind().dialect.name == "postgresql" else ""
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.execute(
+                f"CREATE INDEX {_concurrently()}IF NOT EXISTS {name} ON {table} ({columns})"
+                + (f" WHERE {where}" if where else "")
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _table, _columns, _where in reversed(INDEXES):
+            op.execute(f"DROP INDEX {_concurrently()}IF EXISTS {name}")
@@ -0,0 +1,45 @@
+"""add the deal/client columns the statistics queries read
+
+Revision ID: add_deal_analytics_columns
+Revises: add_owner_id_to_clients
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_deal_analytics_columns'
+down_revision = 'add_owner_id_to_clients'
+branch_labels = None
+depends_on = None
+
+# Databases provisioned outside this chain already have these columns, hence
+# IF NOT EXISTS; the analytics indexes and rollup backfill depend on them
+COLUMNS = [
+    ('deals', 'status', 'VARCHAR'),
+    ('deals', 'product_category', 'VARCHAR'),
+    ('deals', 'product_id', 'INTEGER'),
+    ('deals', 'quantity', 'INTEGER'),
+    ('clients', 'sport', 'VARCHAR'),
+]
+
+def upgrade() -> None:
+    for table, column, column_type in COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}")
+
+    # Deals created through the ORM only carry a stage, stored as the
+    # DealStage member name ('WON'); the statistics filter on status = 'won'.
+    # Only closed stages have a status equivalent; open ones stay NULL
+    op.execute("""
+        UPDATE deals
+        SET status = CASE UPPER(CAST(stage AS VARCHAR))
+            WHEN 'WON' THEN 'won'
+            WHEN 'LOST' THEN 'lost'
+        END
+        WHERE status IS NULL AND UPPER(CAST(stage AS VARCHAR)) IN ('WON', 'LOST')
+    """)
+
+def downgrade() -> None:
+    # Left in place: on most databases these columns predate this revision
+    # and hold data the upgrade didn't create
+    pass
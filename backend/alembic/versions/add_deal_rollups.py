@@ -0,0 +1,84 @@
+"""add daily deal rollup tables
+
+Revision ID: add_deal_rollups
+Revises: add_analytics_indexes
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_deal_rollups'
+down_revision = 'add_analytics_indexes'
+branch_labels = None
+depends_on = None
+
+KEY_COLUMNS = ['day', 'product_id', 'product_category', 'sport', 'owner_id', 'status']
+
+def _key_columns():
+    return [
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('product_category', sa.String(), nullable=False, server_default=''),
+        sa.Column('sport', sa.String(), nullable=False, server_default=''),
+        sa.Column('owner_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(), nullable=False, server_default=''),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        'deal_daily_rollups',
+        *_key_columns(),
+        sa.Column('deal_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('quantity_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint(*KEY_COLUMNS)
+    )
+    op.create_table(
+        'deal_daily_rollup_clients',
+        *_key_columns(),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('deal_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint(*KEY_COLUMNS, 'client_id')
+    )
+
+    # Backfill from existing deals; afterwards the deal write path keeps them current
+    op.execute("""
+        INSERT INTO deal_daily_rollups
+            (day, product_id, product_category, sport, owner_id, status, deal_count, amount_sum, quantity_sum)
+        SELECT
+            CAST(d.created_at AS DATE),
+            COALESCE(d.product_id, 0),
+            COALESCE(d.product_category, ''),
+            COALESCE(c.sport, ''),
+            COALESCE(d.owner_id, 0),
+            COALESCE(CAST(d.status AS TEXT), ''),
+            COUNT(*),
+            COALESCE(SUM(d.amount), 0),
+            COALESCE(SUM(d.quantity), 0)
+        FROM deals d
+        LEFT JOIN clients c ON c.id = d.client_id
+        WHERE d.created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    op.execute("""
+        INSERT INTO deal_daily_rollup_clients
+            (day, product_id, product_category, sport, owner_id, status, client_id, deal_count)
+        SELECT
+            CAST(d.created_at AS DATE),
+            COALESCE(d.product_id, 0),
+            COALESCE(d.product_category, ''),
+            COALESCE(c.sport, ''),
+            COALESCE(d.owner_id, 0),
+            COALESCE(CAST(d.status AS TEXT), ''),
+            d.client_id,
+            COUNT(*)
+        FROM deals d
+        LEFT JOIN clients c ON c.id = d.client_id
+        WHERE d.created_at IS NOT NULL AND d.client_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """)
+
+def downgrade() -> None:
+    op.drop_table('deal_daily_rollup_clients')
+    op.drop_table('deal_daily_rollups')
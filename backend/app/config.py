@@ -1,9 +1,42 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     # Existing settings...
 
+    # Database Configuration
+    SQLALCHEMY_DATABASE_URL: str = "sqlite:///./crm_sports.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds, keep below the server/proxy idle timeout
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+
+    # Optional read replica for statistics/export; reads stick to the primary
+    # for DB_REPLICA_PIN_SECONDS after the same caller writes
+    SQLALCHEMY_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_PIN_SECONDS: float = 5.0
+
+    # SQLite single-node concurrency mode: WAL + tuned pragmas + one writer thread
+    SQLITE_CONCURRENCY_MODE: bool = False
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE: int = -65536  # negative means KiB, i.e. 64 MiB
+
+    # SQL instrumentation (Server-Timing header and slow-query log)
+    SLOW_QUERY_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN: bool = False
+    SQL_TIMING_TOP_N: int = 3
+
+    # Bulk create/upsert endpoints
+    BULK_MAX_ITEMS: int = 10000
+
+    # Concurrent analytics queries (utils/query_group.py)
+    QUERY_GROUP_TIMEOUT: float = 30.0
+    QUERY_GROUP_CONCURRENCY: int = 4
+
     # Mercado Libre Configuration
     MELI_CLIENT_ID: str
     MELI_CLIENT_SECRET: str
@@ -12,6 +45,14 @@ class Settings(BaseSettings):
     MELI_SITE_ID: str = "MLA"  # Argentina
     MELI_API_BASE_URL: str = "https://api.mercadolibre.com"
     MELI_AUTH_URL: str = "https://auth.mercadolibre.com.ar"
+
+    # Shared MeLi HTTP client (services/meli_http.py)
+    MELI_HTTP_CONNECT_TIMEOUT: float = 5.0
+    MELI_HTTP_READ_TIMEOUT: float = 20.0
+    MELI_HTTP_MAX_CONNECTIONS: int = 20
+    MELI_HTTP_MAX_KEEPALIVE: int = 10
+    MELI_HTTP2: bool = True  # used when the h2 package is installed
+    MELI_SYNC_CONCURRENCY: int = 8  # listings in flight during a bulk sync
     
     class Config:
         env_file = ".env"
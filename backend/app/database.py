@@ -1,20 +1,330 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from concurrent.futures import Future
+import contextvars
+from typing import Callable, Dict, Any, Optional, TypeVar
+import hashlib
+import queue
+import threading
+import time
+from .config import settings
 
-# Using SQLite instead of PostgreSQL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./crm_sports.db"
+T = TypeVar("T")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
+SQLITE_CONCURRENCY_MODE = (
+    SQLALCHEMY_DATABASE_URL.startswith("sqlite") and settings.SQLITE_CONCURRENCY_MODE
 )
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            self.wait_time += elapsed
+            self.max_wait_time = max(self.max_wait_time, elapsed)
+            if timed_out:
+                self.timeouts += 1
+
+class _InstrumentedPoolMixin:
+    # Counts checkouts that found no idle connection and no overflow room,
+    # i.e. requests that had to queue for a connection
+    stats: PoolStats = None
+
+    def _do_get(self):
+        if self.stats is None:
+            self.stats = PoolStats()
+
+        must_wait = (
+            self.checkedin() == 0
+            and self._max_overflow > -1
+            and self.overflow() >= self._max_overflow
+        )
+        if not must_wait:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    if url.startswith("sqlite") and ":memory:" in url:
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # The CRUD write path relies on FK violations instead of pre-check SELECTs
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def to_async_url(url: str) -> str:
+    # Swap the sync DBAPI driver for its asyncio counterpart
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    if url.startswith("postgresql"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+ASYNC_SQLALCHEMY_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Async engine for the async routers (statistics, export) so a slow
+# aggregate only suspends its own request instead of the event loop
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL, async_engine=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+if SQLITE_CONCURRENCY_MODE:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+class SerializedWriter:
+    # Runs every write on one dedicated thread/connection so SQLite never sees
+    # two writers at once; readers keep using the pool concurrently under WAL
+    def __init__(self, session_factory: Callable[[], Session]):
+        self._session_factory = session_factory
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            fn, future, context = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            context.run(self._execute, fn, future)
+
+    def _execute(self, fn, future):
+        db = self._session_factory()
+        try:
+            result = fn(db)
+            db.commit()
+            future.set_result(result)
+        except BaseException as e:
+            db.rollback()
+            future.set_exception(e)
+        finally:
+            db.close()
+
+    def submit(self, fn: Callable[[Session], T]) -> "Future[T]":
+        self._ensure_started()
+        future: "Future[T]" = Future()
+        # Carry the caller's context (e.g. per-request SQL timing) to the writer
+        self._queue.put((fn, future, contextvars.copy_context()))
+        return future
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+sqlite_writer: Optional[SerializedWriter] = None
+if SQLITE_CONCURRENCY_MODE:
+    # Results are handed back to another thread, so keep them loaded after commit
+    sqlite_writer = SerializedWriter(
+        sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+    )
+
+replica_engine = None
+async_replica_engine = None
+if settings.SQLALCHEMY_REPLICA_URL:
+    REPLICA_URL = settings.SQLALCHEMY_REPLICA_URL
+    replica_engine = create_engine(REPLICA_URL, **engine_options(REPLICA_URL))
+    async_replica_engine = create_async_engine(
+        to_async_url(REPLICA_URL),
+        **engine_options(to_async_url(REPLICA_URL), async_engine=True)
+    )
+    if SQLITE_CONCURRENCY_MODE and REPLICA_URL.startswith("sqlite"):
+        event.listen(replica_engine, "connect", _set_sqlite_pragmas)
+        event.listen(async_replica_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+class PrimaryPins:
+    # Callers that just wrote read from the primary for a short while so they
+    # see their own writes despite replica lag (per process)
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._pins: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, key: Optional[str]):
+        if not key or self.seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pins[key] = now + self.seconds
+            if len(self._pins) > 10000:
+                self._pins = {k: v for k, v in self._pins.items() if v > now}
+
+    def is_pinned(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            until = self._pins.get(key)
+        return until is not None and until > time.monotonic()
+
+primary_pins = PrimaryPins(settings.DB_REPLICA_PIN_SECONDS)
+
+def pin_key_for(request: Request) -> str:
+    # Identify the caller by bearer token, falling back to the client address
+    source = request.headers.get("authorization") or (
+        request.client.host if request.client else ""
+    )
+    return hashlib.sha1(source.encode()).hexdigest()
+
+class RoutingSession(Session):
+    primary_bind = engine
+    replica_bind = replica_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.replica_bind is not None
+            and self.info.get("read_only")
+            and not self._flushing
+            and not primary_pins.is_pinned(self.info.get("pin_key"))
+        ):
+            return self.replica_bind
+        return self.primary_bind
+
+class AsyncRoutingSession(RoutingSession):
+    primary_bind = async_engine.sync_engine
+    replica_bind = async_replica_engine.sync_engine if async_replica_engine is not None else None
+
+ReplicaSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, info={"read_only": True}
+)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=AsyncRoutingSession,
+    autoflush=False, expire_on_commit=False, info={"read_only": True}
+)
+
 Base = declarative_base()
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["pin_key"] = pin_key_for(request)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_replica_db(request: Request):
+    # Reporting reads: served by the replica unless this caller is pinned
+    async with AsyncReplicaSessionLocal() as db:
+        db.info["pin_key"] = pin_key_for(request)
+        yield db
+
+def run_write(db: Session, fn: Callable[[Session], T]) -> T:
+    # Execute and commit a unit of write work. In SQLite concurrency mode it is
+    # queued to the writer thread, otherwise it runs on the request session.
+    if sqlite_writer is not None:
+        result = sqlite_writer.submit(fn).result()
+    else:
+        try:
+            result = fn(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    primary_pins.pin(db.info.get("pin_key"))
+    return result
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    data = {"pool_class": type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return data
+
+    stats = getattr(pool, "stats", None) or PoolStats()
+    data.update({
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "waits": stats.waits,
+        "wait_time_total": round(stats.wait_time, 4),
+        "wait_time_avg": round(stats.wait_time / stats.waits, 4) if stats.waits else 0,
+        "wait_time_max": round(stats.max_wait_time, 4),
+        "timeouts": stats.timeouts
+    })
+    return data
+
+def get_pool_stats() -> Dict[str, Any]:
+    stats = {
+        "primary": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.sync_engine.pool)
+    }
+    if replica_engine is not None:
+        stats["replica"] = _pool_stats(replica_engine.pool)
+        stats["async_replica"] = _pool_stats(async_replica_engine.sync_engine.pool)
+    return stats
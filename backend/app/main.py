@@ -1,12 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, async_engine, sqlite_writer, Base
+from .middleware.sql_timing import SQLTimingMiddleware
+from .utils.conditional import NotModified, not_modified_handler
+from .services.meli_http import start_meli_client, close_meli_client
+from .services.meli_monitor import MeliMonitor
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="CRM Sports API")
 
+app.add_middleware(SQLTimingMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -14,12 +21,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing", "ETag"],
 )
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to CRM Sports API"}
-from .services.meli_monitor import MeliMonitor
 
-app = FastAPI()
-meli_monitor = MeliMonitor()
\ No newline at end of file
+@app.on_event("startup")
+async def open_meli_client():
+    await start_meli_client()
+
+@app.on_event("shutdown")
+async def shutdown_meli_client():
+    await close_meli_client()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if sqlite_writer is not None:
+        sqlite_writer.stop()
+    await async_engine.dispose()
+
+meli_monitor = MeliMonitor()
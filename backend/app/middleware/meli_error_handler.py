@@ -1,6 +1,7 @@
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
-from ..services.cache import CacheService
+from ..services.cache import AsyncCacheService
+from datetime import datetime
 import json
 import logging
 
@@ -22,7 +23,7 @@ class MeliErrorHandler(BaseHTTPMiddleware):
                     logger.error(f"MeLi API Error: {response_data.get('error')}")
                     
                     # Store error for monitoring
-                    CacheService.set(
+                    await AsyncCacheService.set(
                         f"meli_error_{datetime.now().timestamp()}",
                         {
                             "endpoint": request.url.path,
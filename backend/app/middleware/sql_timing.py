@@ -0,0 +1,126 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    # Collapse literals and whitespace so the same query always groups together
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+def parameter_shape(parameters: Any) -> Any:
+    # Types only, never values: safe to log and stable across calls
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"rows": len(parameters), "row": parameter_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+class QueryStats:
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.statements.append((elapsed, statement))
+
+    def top(self, n: int) -> List[Tuple[float, str]]:
+        return sorted(self.statements, key=lambda item: item[0], reverse=True)[:n]
+
+    def server_timing(self, top_n: int) -> str:
+        entries = [f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries"']
+        for index, (elapsed, statement) in enumerate(self.top(top_n), start=1):
+            entries.append(
+                f'db-q{index};dur={elapsed * 1000:.2f};desc="{_header_safe(normalize_sql(statement))}"'
+            )
+        return ", ".join(entries)
+
+def _header_safe(text: str, limit: int = 80) -> str:
+    text = text.encode("ascii", "ignore").decode()
+    text = text.replace("\\", "").replace('"', "'")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    if conn.dialect.name == "sqlite":
+        explain_sql = f"EXPLAIN QUERY PLAN {statement}"
+    else:
+        explain_sql = f"EXPLAIN {statement}"
+
+    # A fresh raw cursor keeps the original result set intact and bypasses
+    # these event hooks
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(explain_sql, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.debug(f"EXPLAIN failed for slow query: {str(e)}")
+        return None
+    finally:
+        cursor.close()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 < settings.SLOW_QUERY_MS:
+        return
+
+    slow_query: Dict[str, Any] = {
+        "duration_ms": round(elapsed * 1000, 2),
+        "path": stats.path if stats is not None else None,
+        "sql": normalize_sql(statement),
+        "params": parameter_shape(parameters),
+        "executemany": executemany
+    }
+    is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    if settings.SLOW_QUERY_EXPLAIN and is_select and not executemany:
+        slow_query["plan"] = _explain(conn, statement, parameters)
+
+    logger.warning(f"Slow query: {slow_query}")
+
+class SQLTimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats(request.url.path)
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        response.headers["Server-Timing"] = stats.server_timing(settings.SQL_TIMING_TOP_N)
+        return response
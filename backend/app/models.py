@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -33,12 +33,21 @@ class User(Base):
 
 class Deal(Base):
     __tablename__ = "deals"
+    # Names match alembic/versions/add_analytics_indexes.py
+    __table_args__ = (
+        Index("ix_deals_owner_id", "owner_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"))
     owner_id = Column(Integer, ForeignKey("users.id"))
     stage = Column(Enum(DealStage), default=DealStage.LEAD)
     amount = Column(Float)
+    # Read by the statistics queries and rollups; see add_deal_analytics_columns
+    status = Column(String)
+    product_category = Column(String)
+    product_id = Column(Integer)
+    quantity = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     client = relationship("Client", back_populates="deals")
@@ -47,12 +56,16 @@ class Deal(Base):
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("ix_clients_owner_id", "owner_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True)
     phone = Column(String)
     company = Column(String)
+    sport = Column(String)
     owner_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -61,6 +74,10 @@ class Client(Base):
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_deal_id", "deal_id"),
+        Index("ix_activities_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     deal_id = Column(Integer, ForeignKey("deals.id"))
@@ -68,4 +85,33 @@ class Activity(Base):
     description = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    deal = relationship("Deal", back_populates="activities")
\ No newline at end of file
+    deal = relationship("Deal", back_populates="activities")
+
+class DealDailyRollup(Base):
+    # Maintained by services/rollups.py; key columns use '' / 0 instead of
+    # NULL so ON CONFLICT can match them
+    __tablename__ = "deal_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True, default=0)
+    product_category = Column(String, primary_key=True, default="")
+    sport = Column(String, primary_key=True, default="")
+    owner_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String, primary_key=True, default="")
+    deal_count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Float, nullable=False, default=0)
+    quantity_sum = Column(Float, nullable=False, default=0)
+
+class DealDailyRollupClient(Base):
+    # Distinct-client sketch per rollup cell: one row per client with the
+    # number of its deals in the cell, so windows merge with COUNT(DISTINCT)
+    __tablename__ = "deal_daily_rollup_clients"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True, default=0)
+    product_category = Column(String, primary_key=True, default="")
+    sport = Column(String, primary_key=True, default="")
+    owner_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String, primary_key=True, default="")
+    client_id = Column(Integer, primary_key=True)
+    deal_count = Column(Integer, nullable=False, default=0)
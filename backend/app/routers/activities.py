@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth.utils import get_current_user
 from ..auth.permissions import require_admin, require_sales_or_admin
+from ..utils.pagination import keyset_paginate
+from ..utils.bulk import validate_items, bulk_response
+from ..utils.db_errors import integrity_http_error
+from ..services.cache import CacheService
 
 router = APIRouter(
     prefix="/activities",
@@ -17,26 +23,75 @@ def create_activity(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    # Verify deal exists
-    deal = db.query(models.Deal).filter(models.Deal.id == activity.deal_id).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-    
-    db_activity = models.Activity(**activity.dict())
-    db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
-    return db_activity
+    def _create(session: Session):
+        db_activity = session.scalars(
+            insert(models.Activity).values(**activity.dict()).returning(models.Activity)
+        ).one()
+        return schemas.Activity.model_validate(db_activity)
+
+    try:
+        created = run_write(db, _create)
+    except IntegrityError as e:
+        raise integrity_http_error(e, not_found="Deal not found")
+    CacheService.invalidate_tags("activities")
+    return created
+
+@router.post("/bulk", response_model=schemas.BulkResponse)
+def bulk_create_activities(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    results, valid = validate_items(items, schemas.ActivityCreate)
+
+    def _create(session: Session):
+        # Resolve every referenced deal with a single IN query
+        deal_ids = {activity.deal_id for _, activity in valid}
+        known = set(session.scalars(
+            select(models.Deal.id).where(models.Deal.id.in_(deal_ids))
+        )) if deal_ids else set()
+
+        rows = [(index, activity) for index, activity in valid if activity.deal_id in known]
+        missing = [index for index, activity in valid if activity.deal_id not in known]
+        if not rows:
+            return [], missing
+
+        ids = session.scalars(
+            insert(models.Activity).returning(models.Activity.id, sort_by_parameter_order=True),
+            [activity.dict() for _, activity in rows]
+        ).all()
+        return [(index, activity_id) for (index, _), activity_id in zip(rows, ids)], missing
+
+    created, missing = run_write(db, _create)
+    if created:
+        CacheService.invalidate_tags("activities")
+    for index in missing:
+        results[index] = schemas.BulkItemResult(index=index, success=False, error="Deal not found")
+    for index, activity_id in created:
+        results[index] = schemas.BulkItemResult(index=index, success=True, id=activity_id, action="created")
+    return bulk_response(results)
 
 # Add similar protection to other activity endpoints
 
 @router.get("/deal/{deal_id}", response_model=List[schemas.Activity])
 def get_deal_activities(
     deal_id: int, 
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    activities = db.query(models.Activity).filter(models.Activity.deal_id == deal_id).all()
+    query = db.query(models.Activity).filter(models.Activity.deal_id == deal_id)
+    activities, next_cursor = keyset_paginate(
+        query, models.Activity.id, cursor, limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        # Bounded by one deal's activities, served by ix_activities_deal_id
+        response.headers["X-Total-Count"] = str(query.count())
     return activities
 
 @router.get("/{activity_id}", response_model=schemas.Activity)
@@ -57,22 +112,41 @@ def update_activity(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    db_activity = db.query(models.Activity).filter(models.Activity.id == activity_id).first()
-    if db_activity is None:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    # Verify new deal exists if deal_id is being updated
-    if activity.deal_id != db_activity.deal_id:
-        deal = db.query(models.Deal).filter(models.Deal.id == activity.deal_id).first()
-        if not deal:
-            raise HTTPException(status_code=404, detail="Deal not found")
-    
-    for key, value in activity.dict().items():
-        setattr(db_activity, key, value)
-    
-    db.commit()
-    db.refresh(db_activity)
-    return db_activity
+    return _write_activity_changes(db, activity_id, activity.dict())
+
+@router.patch("/{activity_id}", response_model=schemas.Activity)
+def patch_activity(
+    activity_id: int, 
+    activity: schemas.ActivityUpdate, 
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    # Only the fields present in the request body are written
+    return _write_activity_changes(db, activity_id, activity.dict(exclude_unset=True))
+
+def _write_activity_changes(db: Session, activity_id: int, changes: Dict[str, Any]):
+    def _update(session: Session):
+        if changes:
+            stmt = (
+                update(models.Activity)
+                .where(models.Activity.id == activity_id)
+                .values(**changes)
+                .returning(models.Activity)
+            )
+        else:
+            stmt = select(models.Activity).where(models.Activity.id == activity_id)
+        db_activity = session.scalars(stmt).first()
+        if db_activity is None:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return schemas.Activity.model_validate(db_activity)
+
+    try:
+        updated = run_write(db, _update)
+    except IntegrityError as e:
+        raise integrity_http_error(e, not_found="Deal not found")
+    if changes:
+        CacheService.invalidate_tags("activities")
+    return updated
 
 @router.delete("/{activity_id}")
 def delete_activity(
@@ -80,10 +154,13 @@ def delete_activity(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_admin())
 ):
-    activity = db.query(models.Activity).filter(models.Activity.id == activity_id).first()
-    if activity is None:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    db.delete(activity)
-    db.commit()
-    return {"message": "Activity deleted successfully"}
\ No newline at end of file
+    def _delete(session: Session):
+        deleted = session.scalars(
+            delete(models.Activity).where(models.Activity.id == activity_id).returning(models.Activity.id)
+        ).first()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Activity not found")
+
+    run_write(db, _delete)
+    CacheService.invalidate_tags("activities")
+    return {"message": "Activity deleted successfully"}
@@ -1,17 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from ..services.cache import CacheService
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from ..services.cache import CacheService, AsyncCacheService, CacheUnavailable
+from ..services.meli_monitor import MeliMonitor
+from ..services.meli_sync import MeliBulkSync
 from ..auth.dependencies import get_current_admin_user
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import SessionLocal, get_db, get_pool_stats
 from sqlalchemy import text
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from ..utils.pagination import encode_cursor, decode_cursor
+from .. import schemas
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.post("/cache/clear/{cache_key}")
-async def clear_cache(cache_key: str, _=Depends(get_current_admin_user)):
+async def clear_cache(
+    cache_key: str,
+    namespace: Optional[str] = "stats",
+    _=Depends(get_current_admin_user)
+):
     try:
-        CacheService.delete(cache_key)
-        return {"success": True, "message": f"Cache {cache_key} cleared successfully"}
+        # Cached statistics live under "<namespace>:v<N>:<key>"; the bare key
+        # is cleared too for entries written outside a namespace (e.g. meli_token)
+        keys = [cache_key]
+        if namespace:
+            keys.append(await AsyncCacheService.namespaced_key(namespace, cache_key))
+        await AsyncCacheService.delete(*keys)
+        return {
+            "success": True,
+            "message": f"Cache {cache_key} cleared successfully",
+            "keys": keys
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -21,14 +45,50 @@ async def clear_cache(cache_key: str, _=Depends(get_current_admin_user)):
 @router.post("/cache/clear-all")
 async def clear_all_cache(_=Depends(get_current_admin_user)):
     try:
-        CacheService.clear_all()
-        return {"success": True, "message": "All cache cleared successfully"}
+        namespaces = await AsyncCacheService.clear_all()
+        return {
+            "success": True,
+            "message": "All cache cleared successfully",
+            "namespaces": namespaces
+        }
+    except CacheUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Cache unavailable: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error clearing all cache: {str(e)}"
         )
 
+@router.post("/cache/namespaces/{namespace}/clear")
+async def clear_cache_namespace(namespace: str, _=Depends(get_current_admin_user)):
+    try:
+        await AsyncCacheService.clear_namespace(namespace)
+        return {"success": True, "message": f"Cache namespace {namespace} cleared successfully"}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error clearing cache namespace: {str(e)}"
+        )
+
+@router.post("/cache/namespaces/{namespace}/purge")
+async def purge_cache_namespace(namespace: str, _=Depends(get_current_admin_user)):
+    try:
+        deleted = await AsyncCacheService.purge_namespace(namespace)
+        return {"success": True, "data": {"namespace": namespace, "deleted": deleted}}
+    except CacheUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Cache unavailable: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error purging cache namespace: {str(e)}"
+        )
+
 @router.get("/system-stats")
 async def get_system_stats(db: Session = Depends(get_db), _=Depends(get_current_admin_user)):
     try:
@@ -59,6 +119,19 @@ async def get_system_stats(db: Session = Depends(get_db), _=Depends(get_current_
             detail=f"Error fetching system stats: {str(e)}"
         )
 
+@router.get("/cache-stats")
+async def get_cache_prefix_stats(top: int = 20, _=Depends(get_current_admin_user)):
+    try:
+        return {
+            "success": True,
+            "data": CacheService.prefix_stats(top)
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching cache prefix stats: {str(e)}"
+        )
+
 @router.post("/maintenance-mode")
 async def toggle_maintenance_mode(
     enable: bool,
@@ -67,7 +140,7 @@ async def toggle_maintenance_mode(
     try:
         # Implementation would depend on your maintenance mode strategy
         # Could be stored in Redis or database
-        CacheService.set("maintenance_mode", enable)
+        await AsyncCacheService.set("maintenance_mode", enable)
         return {
             "success": True,
             "message": f"Maintenance mode {'enabled' if enable else 'disabled'}"
@@ -115,7 +188,8 @@ async def get_performance_metrics(db: Session = Depends(get_db), _=Depends(get_c
                 "avg_deal_completion_time": float(metrics[0]) if metrics[0] else 0,
                 "deals_last_24h": metrics[1],
                 "system_events_24h": metrics[2],
-                "cache_status": "healthy" if CacheService.is_available() else "unavailable"
+                "cache_status": "healthy" if CacheService.is_available() else "unavailable",
+                "cache": CacheService.health()
             }
         }
     except Exception as e:
@@ -124,28 +198,68 @@ async def get_performance_metrics(db: Session = Depends(get_db), _=Depends(get_c
             detail=f"Error fetching performance metrics: {str(e)}"
         )
 
+@router.get("/monitor/cache")
+async def get_cache_stats(_=Depends(get_current_admin_user)):
+    try:
+        return {
+            "success": True,
+            "data": CacheService.stats()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching cache stats: {str(e)}"
+        )
+
+@router.get("/monitor/db-pool")
+async def get_db_pool_stats(_=Depends(get_current_admin_user)):
+    try:
+        return {
+            "success": True,
+            "data": get_pool_stats()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching connection pool stats: {str(e)}"
+        )
+
 @router.get("/logs/errors")
 async def get_error_logs(
-    limit: int = 100,
-    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     _=Depends(get_current_admin_user)
 ):
     try:
-        logs_query = """
+        params = {"limit": limit + 1, "skip": skip}
+        keyset_filter = ""
+        if cursor:
+            params["cursor_created_at"], params["cursor_id"] = decode_cursor(cursor)
+            params["skip"] = 0
+            keyset_filter = "WHERE (created_at, id) < (:cursor_created_at, :cursor_id)"
+
+        logs_query = f"""
             SELECT 
                 created_at,
                 error_type,
                 error_message,
                 stack_trace,
                 user_id,
-                endpoint
+                endpoint,
+                id
             FROM error_logs
-            ORDER BY created_at DESC
+            {keyset_filter}
+            ORDER BY created_at DESC, id DESC
             LIMIT :limit OFFSET :skip
         """
         
-        logs = db.execute(text(logs_query), {"limit": limit, "skip": skip}).fetchall()
+        logs = db.execute(text(logs_query), params).fetchall()
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(logs[-1][0], logs[-1][6])
         
         return {
             "success": True,
@@ -158,10 +272,108 @@ async def get_error_logs(
                     "user_id": log[4],
                     "endpoint": log[5]
                 } for log in logs
-            ]
+            ],
+            "next_cursor": next_cursor
         }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching error logs: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/monitor/meli")
+async def get_meli_metrics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = "hour",
+    _=Depends(get_current_admin_user)
+):
+    try:
+        end = end or datetime.now()
+        metrics = await MeliMonitor().get_metrics(start or end - timedelta(hours=24), end, resolution)
+        return {
+            "success": True,
+            "data": metrics
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except CacheUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Metrics store unavailable: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching MeLi metrics: {str(e)}"
+        )
+
+# Running bulk syncs, referenced so the event loop doesn't drop them
+_meli_sync_tasks = set()
+MELI_SYNC_JOB_TTL = 86400
+
+async def _run_meli_sync(job_id: str, request: schemas.MeliSyncRequest):
+    key = f"meli_sync:{job_id}"
+
+    async def save(progress: Dict[str, Any]):
+        try:
+            await AsyncCacheService.set(key, progress, MELI_SYNC_JOB_TTL)
+        except CacheUnavailable as e:
+            logger.warning(f"Could not store MeLi sync progress for {job_id}: {str(e)}")
+
+    db = SessionLocal()
+    try:
+        await MeliBulkSync(db, concurrency=request.concurrency).run(
+            request.product_ids, request.changed_since, on_progress=save
+        )
+    except Exception as e:
+        logger.error(f"MeLi sync {job_id} failed: {str(e)}")
+        await save({"status": "failed", "error": str(e)})
+    finally:
+        db.close()
+
+@router.post("/meli/sync", status_code=status.HTTP_202_ACCEPTED)
+async def start_meli_sync(
+    request: schemas.MeliSyncRequest,
+    _=Depends(get_current_admin_user)
+):
+    if request.product_ids is None and request.changed_since is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide product_ids or changed_since"
+        )
+    if request.concurrency is not None and request.concurrency < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="concurrency must be at least 1"
+        )
+    try:
+        job_id = uuid.uuid4().hex
+        await AsyncCacheService.set(f"meli_sync:{job_id}", {"status": "queued"}, MELI_SYNC_JOB_TTL)
+        task = asyncio.create_task(_run_meli_sync(job_id, request))
+        _meli_sync_tasks.add(task)
+        task.add_done_callback(_meli_sync_tasks.discard)
+        return {"success": True, "job_id": job_id}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting MeLi sync: {str(e)}"
+        )
+
+@router.get("/meli/sync/{job_id}")
+async def get_meli_sync(job_id: str, _=Depends(get_current_admin_user)):
+    try:
+        progress = await AsyncCacheService.get(f"meli_sync:{job_id}")
+    except CacheUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Progress store unavailable: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching MeLi sync: {str(e)}"
+        )
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sync job not found")
+    return {"success": True, "data": progress}
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth.utils import verify_password, get_password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(
@@ -18,15 +19,18 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     hashed_password = get_password_hash(user.password)
-    db_user = models.User(
-        email=user.email,
-        username=user.username,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+
+    def _create(session: Session):
+        db_user = session.scalars(
+            insert(models.User).values(
+                email=user.email,
+                username=user.username,
+                hashed_password=hashed_password
+            ).returning(models.User)
+        ).one()
+        return schemas.User.model_validate(db_user)
+
+    return run_write(db, _create)
 
 @router.post("/token", response_model=schemas.Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
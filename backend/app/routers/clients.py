@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth.utils import get_current_user
 from ..auth.permissions import require_admin, require_sales_or_admin
+from ..utils.pagination import keyset_paginate, approximate_count
+from ..utils.bulk import validate_items, dialect_insert, bulk_response
+from ..utils.db_errors import integrity_http_error
+from ..services.rollups import RollupService
+from ..services.cache import CacheService
 
 router = APIRouter(
     prefix="/clients",
@@ -17,20 +24,92 @@ def create_client(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    db_client = models.Client(**client.dict())
-    db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
-    return db_client
+    def _create(session: Session):
+        db_client = session.scalars(
+            insert(models.Client).values(**client.dict()).returning(models.Client)
+        ).one()
+        return schemas.Client.model_validate(db_client)
+
+    try:
+        created = run_write(db, _create)
+    except IntegrityError as e:
+        raise integrity_http_error(e, conflict="Client with this email already exists")
+    CacheService.invalidate_tags("clients")
+    return created
+
+@router.post("/bulk", response_model=schemas.BulkResponse)
+def bulk_upsert_clients(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    results, valid = validate_items(items, schemas.ClientCreate)
+
+    # Upsert by email; within one batch the last item for an email wins
+    latest: Dict[str, int] = {}
+    for position, (index, client) in enumerate(valid):
+        if client.email in latest:
+            superseded = valid[latest[client.email]][0]
+            results[superseded] = schemas.BulkItemResult(
+                index=superseded, success=False,
+                error="Superseded by a later item with the same email"
+            )
+        latest[client.email] = position
+    rows = [valid[position] for position in sorted(latest.values())]
+
+    def _upsert(session: Session):
+        if not rows:
+            return []
+        emails = [client.email for _, client in rows]
+        existing = set(session.scalars(
+            select(models.Client.email).where(models.Client.email.in_(emails))
+        ))
+
+        stmt = dialect_insert(session, models.Client)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.Client.email],
+            set_={
+                "name": stmt.excluded.name,
+                "phone": stmt.excluded.phone,
+                "company": stmt.excluded.company
+            }
+        ).returning(models.Client.id, sort_by_parameter_order=True)
+        ids = session.scalars(stmt, [client.dict() for _, client in rows]).all()
+        return [
+            (index, client_id, "updated" if client.email in existing else "created")
+            for (index, client), client_id in zip(rows, ids)
+        ]
+
+    upserted = run_write(db, _upsert)
+    if upserted:
+        CacheService.invalidate_tags(
+            "clients",
+            *(f"client:{client_id}" for _, client_id, action in upserted if action == "updated")
+        )
+    for index, client_id, action in upserted:
+        results[index] = schemas.BulkItemResult(
+            index=index, success=True, id=client_id, action=action
+        )
+    return bulk_response(results)
 
 @router.get("/", response_model=List[schemas.Client])
 def get_clients(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    clients = db.query(models.Client).offset(skip).limit(limit).all()
+    clients, next_cursor = keyset_paginate(
+        db.query(models.Client), models.Client.id,
+        cursor, limit, skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count"] = str(approximate_count(db, "clients"))
     return clients
 
 @router.get("/{client_id}", response_model=schemas.Client)
@@ -51,16 +130,41 @@ def update_client(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    db_client = db.query(models.Client).filter(models.Client.id == client_id).first()
-    if db_client is None:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    for key, value in client.dict().items():
-        setattr(db_client, key, value)
-    
-    db.commit()
-    db.refresh(db_client)
-    return db_client
+    return _write_client_changes(db, client_id, client.dict())
+
+@router.patch("/{client_id}", response_model=schemas.Client)
+def patch_client(
+    client_id: int, 
+    client: schemas.ClientUpdate, 
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    # Only the fields present in the request body are written
+    return _write_client_changes(db, client_id, client.dict(exclude_unset=True))
+
+def _write_client_changes(db: Session, client_id: int, changes: Dict[str, Any]):
+    def _update(session: Session):
+        if changes:
+            stmt = (
+                update(models.Client)
+                .where(models.Client.id == client_id)
+                .values(**changes)
+                .returning(models.Client)
+            )
+        else:
+            stmt = select(models.Client).where(models.Client.id == client_id)
+        db_client = session.scalars(stmt).first()
+        if db_client is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        return schemas.Client.model_validate(db_client)
+
+    try:
+        updated = run_write(db, _update)
+    except IntegrityError as e:
+        raise integrity_http_error(e, conflict="Client with this email already exists")
+    if changes:
+        CacheService.invalidate_tags("clients", f"client:{client_id}")
+    return updated
 
 @router.delete("/{client_id}")
 def delete_client(
@@ -68,10 +172,24 @@ def delete_client(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_admin())
 ):
-    client = db.query(models.Client).filter(models.Client.id == client_id).first()
-    if client is None:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    db.delete(client)
-    db.commit()
+    def _delete(session: Session):
+        # Detach deals like the ORM relationship did, then delete in one statement.
+        # Detached deals move to the empty-sport rollup cell.
+        rollups = RollupService(session)
+        rollups.remove_client_deals(client_id)
+        detached = session.scalars(
+            update(models.Deal)
+            .where(models.Deal.client_id == client_id)
+            .values(client_id=None)
+            .returning(models.Deal.id)
+        ).all()
+        rollups.add_deals(detached)
+        deleted = session.scalars(
+            delete(models.Client).where(models.Client.id == client_id).returning(models.Client.id)
+        ).first()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+
+    run_write(db, _delete)
+    CacheService.invalidate_tags("clients", "deals", f"client:{client_id}")
     return {"message": "Client deleted successfully"}
\ No newline at end of file
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, run_write
 from ..auth.utils import get_current_user
 from ..auth.permissions import require_admin, require_sales_or_admin
+from ..utils.pagination import keyset_paginate, approximate_count
+from ..utils.bulk import validate_items, bulk_response
+from ..utils.db_errors import integrity_http_error
+from ..services.rollups import RollupService
+from ..services.cache import CacheService
 
 router = APIRouter(
     prefix="/deals",
@@ -17,25 +24,76 @@ def create_deal(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    # Verify client exists
-    client = db.query(models.Client).filter(models.Client.id == deal.client_id).first()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    db_deal = models.Deal(**deal.dict())
-    db.add(db_deal)
-    db.commit()
-    db.refresh(db_deal)
-    return db_deal
+    def _create(session: Session):
+        db_deal = session.scalars(
+            insert(models.Deal).values(**deal.dict()).returning(models.Deal)
+        ).one()
+        RollupService(session).add_deals([db_deal.id])
+        return schemas.Deal.model_validate(db_deal)
+
+    try:
+        created = run_write(db, _create)
+    except IntegrityError as e:
+        raise integrity_http_error(e, not_found="Client not found")
+    CacheService.invalidate_tags("deals", f"client:{created.client_id}")
+    return created
+
+@router.post("/bulk", response_model=schemas.BulkResponse)
+def bulk_create_deals(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    results, valid = validate_items(items, schemas.DealCreate)
+    valid_items = dict(valid)
+
+    def _create(session: Session):
+        # Resolve every referenced client with a single IN query
+        client_ids = {deal.client_id for _, deal in valid}
+        known = set(session.scalars(
+            select(models.Client.id).where(models.Client.id.in_(client_ids))
+        )) if client_ids else set()
+
+        rows = [(index, deal) for index, deal in valid if deal.client_id in known]
+        missing = [index for index, deal in valid if deal.client_id not in known]
+        if not rows:
+            return [], missing
+
+        ids = session.scalars(
+            insert(models.Deal).returning(models.Deal.id, sort_by_parameter_order=True),
+            [deal.dict() for _, deal in rows]
+        ).all()
+        RollupService(session).add_deals(ids)
+        return [(index, deal_id) for (index, _), deal_id in zip(rows, ids)], missing
+
+    created, missing = run_write(db, _create)
+    if created:
+        client_ids = {valid_items[index].client_id for index, _ in created}
+        CacheService.invalidate_tags("deals", *(f"client:{client_id}" for client_id in client_ids))
+    for index in missing:
+        results[index] = schemas.BulkItemResult(index=index, success=False, error="Client not found")
+    for index, deal_id in created:
+        results[index] = schemas.BulkItemResult(index=index, success=True, id=deal_id, action="created")
+    return bulk_response(results)
 
 @router.get("/", response_model=List[schemas.Deal])
 def get_deals(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(get_current_user)
 ):
-    deals = db.query(models.Deal).offset(skip).limit(limit).all()
+    deals, next_cursor = keyset_paginate(
+        db.query(models.Deal), models.Deal.id,
+        cursor, limit, skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count"] = str(approximate_count(db, "deals"))
     return deals
 
 @router.get("/{deal_id}", response_model=schemas.Deal)
@@ -56,16 +114,55 @@ def update_deal(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_sales_or_admin())
 ):
-    db_deal = db.query(models.Deal).filter(models.Deal.id == deal_id).first()
-    if db_deal is None:
-        raise HTTPException(status_code=404, detail="Deal not found")
-    
-    for key, value in deal.dict().items():
-        setattr(db_deal, key, value)
-    
-    db.commit()
-    db.refresh(db_deal)
-    return db_deal
+    return _write_deal_changes(db, deal_id, deal.dict())
+
+@router.patch("/{deal_id}", response_model=schemas.Deal)
+def patch_deal(
+    deal_id: int, 
+    deal: schemas.DealUpdate, 
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_sales_or_admin())
+):
+    # Only the fields present in the request body are written
+    return _write_deal_changes(db, deal_id, deal.dict(exclude_unset=True))
+
+def _write_deal_changes(db: Session, deal_id: int, changes: Dict[str, Any]):
+    def _update(session: Session):
+        rollups = RollupService(session)
+        previous_client_id = None
+        if "client_id" in changes:
+            # Both the old and the new client's cached entries go stale
+            previous_client_id = session.scalar(
+                select(models.Deal.client_id).where(models.Deal.id == deal_id)
+            )
+        if changes:
+            rollups.remove_deals([deal_id])
+            stmt = (
+                update(models.Deal)
+                .where(models.Deal.id == deal_id)
+                .values(**changes)
+                .returning(models.Deal)
+            )
+        else:
+            stmt = select(models.Deal).where(models.Deal.id == deal_id)
+        db_deal = session.scalars(stmt).first()
+        if db_deal is None:
+            raise HTTPException(status_code=404, detail="Deal not found")
+        if changes:
+            rollups.add_deals([deal_id])
+        return schemas.Deal.model_validate(db_deal), previous_client_id
+
+    try:
+        updated, previous_client_id = run_write(db, _update)
+    except IntegrityError as e:
+        raise integrity_http_error(e, not_found="Client not found")
+    if changes:
+        CacheService.invalidate_tags(
+            "deals",
+            f"client:{updated.client_id}",
+            f"client:{previous_client_id}" if previous_client_id is not None else None
+        )
+    return updated
 
 @router.delete("/{deal_id}")
 def delete_deal(
@@ -73,10 +170,21 @@ def delete_deal(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_admin())
 ):
-    deal = db.query(models.Deal).filter(models.Deal.id == deal_id).first()
-    if deal is None:
-        raise HTTPException(status_code=404, detail="Deal not found")
-    
-    db.delete(deal)
-    db.commit()
-    return {"message": "Deal deleted successfully"}
\ No newline at end of file
+    def _delete(session: Session):
+        RollupService(session).remove_deals([deal_id])
+        # Detach activities like the ORM relationship did, then delete in one statement
+        session.execute(
+            update(models.Activity).where(models.Activity.deal_id == deal_id).values(deal_id=None)
+        )
+        deleted = session.execute(
+            delete(models.Deal)
+            .where(models.Deal.id == deal_id)
+            .returning(models.Deal.id, models.Deal.client_id)
+        ).first()
+        if deleted is None:
+            raise HTTPException(status_code=404, detail="Deal not found")
+        return deleted.client_id
+
+    client_id = run_write(db, _delete)
+    CacheService.invalidate_tags("deals", "activities", f"client:{client_id}")
+    return {"message": "Deal deleted successfully"}
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_replica_db
 from ..services.export import ExportService
 from typing import Optional
 
@@ -11,7 +11,7 @@ async def export_deals(
     format: str = "csv",
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_replica_db)
 ):
     export_service = ExportService(db)
     
@@ -39,11 +39,11 @@ async def export_deals(
     params = {"start_date": start_date, "end_date": end_date}
     
     if format.lower() == "csv":
-        content = export_service.export_to_csv(query, params)
+        content = await export_service.export_to_csv(query, params)
         media_type = "text/csv"
         filename = "deals_export.csv"
     else:
-        content = export_service.export_to_excel(query, params)
+        content = await export_service.export_to_excel(query, params)
         media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         filename = "deals_export.xlsx"
     
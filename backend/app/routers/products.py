@@ -1,4 +1,5 @@
 from ..services.mercadolibre import MercadoLibreService
+from ..services.cache import AsyncCacheService
 
 @router.put("/{product_id}")
 async def update_product(
@@ -26,6 +27,11 @@ async def update_product(
                 # Log the error but don't stop the update
                 logger.error(f"MeLi sync failed: {meli_result['error']}")
 
+        # Only once the update has committed, or a concurrent reader could cache
+        # the old row under the new version. Covers catalog-dependent statistics
+        # (recommendations, product analytics)
+        await AsyncCacheService.invalidate_tags("products")
+
         return {"success": True, "data": updated_product}
     except Exception as e:
         raise HTTPException(
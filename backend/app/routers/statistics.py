@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
-from ..database import get_db
-from sqlalchemy import text
+from ..database import get_async_replica_db
+from ..utils.query_group import QueryGroup
+from sqlalchemy import text, select, func
+from ..services.windowed_pairs import RepeatOrders, PairCombinations, CategoryRetention, sweep_won_deals
+from datetime import date, timedelta
 from pathlib import Path
 import os
 
@@ -17,7 +20,7 @@ router = APIRouter(
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_sales_summary(db: Session = Depends(get_db)):
+async def get_sales_summary(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         sales_summary = """
             SELECT 
@@ -34,8 +37,14 @@ async def get_sales_summary(db: Session = Depends(get_db)):
             GROUP BY u.username
         """
         
-        sales_data = db.execute(text(sales_summary)).fetchall()
-        stage_data = db.execute(text(stage_summary)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("sales_data", sales_summary)
+            .add("stage_data", stage_summary)
+            .run()
+        )
+        sales_data = grouped["sales_data"]
+        stage_data = grouped["stage_data"]
         
         if not sales_data and not stage_data:
             raise HTTPException(
@@ -65,6 +74,9 @@ async def get_sales_summary(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -77,24 +89,26 @@ async def get_sales_summary(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         # Get total counts
-        total_clients = db.query(Client).count()
-        total_deals = db.query(Deal).count()
-        total_activities = db.query(Activity).count()
+        total_clients = (await db.execute(select(func.count(Client.id)))).scalar()
+        total_deals = (await db.execute(select(func.count(Deal.id)))).scalar()
+        total_activities = (await db.execute(select(func.count(Activity.id)))).scalar()
 
         # Get deals by status
-        deals_by_status = db.query(
-            Deal.status,
-            func.count(Deal.id).label("count"),
-            func.sum(Deal.amount).label("total_amount")
-        ).group_by(Deal.status).all()
+        deals_by_status = (await db.execute(
+            select(
+                Deal.status,
+                func.count(Deal.id).label("count"),
+                func.sum(Deal.amount).label("total_amount")
+            ).group_by(Deal.status)
+        )).all()
 
         # Get recent activities
-        recent_activities = db.query(Activity).order_by(
-            Activity.created_at.desc()
-        ).limit(5).all()
+        recent_activities = (await db.execute(
+            select(Activity).order_by(Activity.created_at.desc()).limit(5)
+        )).scalars().all()
 
         if not deals_by_status and not recent_activities:
             raise HTTPException(
@@ -125,22 +139,39 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_performance_metrics(db: Session = Depends(get_db)):
+async def get_performance_metrics(db: AsyncSession = Depends(get_async_replica_db)):
     try:
+        # Latest 12 months read from the daily rollups (services/rollups.py)
         monthly_metrics = """
+            WITH monthly AS (
+                SELECT 
+                    DATE_TRUNC('month', r.day) as month,
+                    SUM(r.deal_count) as deals_count,
+                    SUM(CASE WHEN r.status = 'won' THEN r.amount_sum ELSE 0 END) as revenue
+                FROM deal_daily_rollups r
+                WHERE r.day >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '11 months'
+                GROUP BY DATE_TRUNC('month', r.day)
+            ),
+            monthly_clients AS (
+                SELECT 
+                    DATE_TRUNC('month', rc.day) as month,
+                    COUNT(DISTINCT rc.client_id) as new_clients
+                FROM deal_daily_rollup_clients rc
+                WHERE rc.day >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '11 months'
+                GROUP BY DATE_TRUNC('month', rc.day)
+            )
             SELECT 
-                DATE_TRUNC('month', d.created_at) as month,
-                COUNT(d.id) as deals_count,
-                SUM(CASE WHEN d.status = 'won' THEN d.amount ELSE 0 END) as revenue,
-                COUNT(DISTINCT c.id) as new_clients
-            FROM deals d
-            LEFT JOIN clients c ON c.id = d.client_id
-            GROUP BY DATE_TRUNC('month', d.created_at)
-            ORDER BY month DESC
+                m.month,
+                m.deals_count,
+                m.revenue,
+                COALESCE(mc.new_clients, 0) as new_clients
+            FROM monthly m
+            LEFT JOIN monthly_clients mc ON mc.month = m.month
+            ORDER BY m.month DESC
             LIMIT 12
         """
         
-        results = db.execute(text(monthly_metrics)).fetchall()
+        results = (await db.execute(text(monthly_metrics))).fetchall()
         
         if not results:
             raise HTTPException(
@@ -167,16 +198,22 @@ async def get_performance_metrics(db: Session = Depends(get_db)):
         )
 
 @router.get("/sports-distribution")
-async def get_sports_distribution(db: Session = Depends(get_db)):
+async def get_sports_distribution(db: AsyncSession = Depends(get_async_replica_db)):
+    # Clients are counted from the rollup sketch, i.e. clients with at least one deal
     sports_metrics = """
+        WITH sport_clients AS (
+            SELECT rc.sport, COUNT(DISTINCT rc.client_id) as client_count
+            FROM deal_daily_rollup_clients rc
+            GROUP BY rc.sport
+        )
         SELECT 
-            c.sport,
-            COUNT(c.id) as client_count,
-            COUNT(DISTINCT d.id) as deals_count,
-            COALESCE(SUM(CASE WHEN d.status = 'won' THEN d.amount ELSE 0 END), 0) as revenue
-        FROM clients c
-        LEFT JOIN deals d ON d.client_id = c.id
-        GROUP BY c.sport
+            NULLIF(r.sport, '') as sport,
+            COALESCE(sc.client_count, 0) as client_count,
+            SUM(r.deal_count) as deals_count,
+            COALESCE(SUM(CASE WHEN r.status = 'won' THEN r.amount_sum ELSE 0 END), 0) as revenue
+        FROM deal_daily_rollups r
+        LEFT JOIN sport_clients sc ON sc.sport = r.sport
+        GROUP BY r.sport, sc.client_count
         ORDER BY client_count DESC
     """
     
@@ -190,8 +227,14 @@ async def get_sports_distribution(db: Session = Depends(get_db)):
         GROUP BY c.sport, a.type
     """
     
-    sports_data = db.execute(text(sports_metrics)).fetchall()
-    activity_data = db.execute(text(activity_by_sport)).fetchall()
+    grouped = await (
+        QueryGroup(db)
+        .add("sports_data", sports_metrics)
+        .add("activity_data", activity_by_sport)
+        .run()
+    )
+    sports_data = grouped["sports_data"]
+    activity_data = grouped["activity_data"]
     
     return {
         "sports_metrics": [
@@ -216,7 +259,7 @@ async def get_sports_distribution(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_activity_trends(db: Session = Depends(get_db)):
+async def get_activity_trends(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         daily_activity_trends = """
             SELECT 
@@ -247,8 +290,14 @@ async def get_activity_trends(db: Session = Depends(get_db)):
             GROUP BY a.type
         """
         
-        trends_data = db.execute(text(daily_activity_trends)).fetchall()
-        completion_data = db.execute(text(activity_completion)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("trends_data", daily_activity_trends)
+            .add("completion_data", activity_completion)
+            .run()
+        )
+        trends_data = grouped["trends_data"]
+        completion_data = grouped["completion_data"]
         
         if not trends_data and not completion_data:
             raise HTTPException(
@@ -281,6 +330,9 @@ async def get_activity_trends(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -294,53 +346,94 @@ async def get_activity_trends(db: Session = Depends(get_db)):
     })
 @cache(expire=timedelta(hours=1))  # Cache for 1 hour
 async def get_supplement_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     period: str = "all"  # Options: "all", "year", "quarter", "month"
 ):
     try:
-        time_filter = ""
+        time_filter = "TRUE"
         if period == "year":
-            time_filter = "WHERE d.created_at >= CURRENT_DATE - INTERVAL '1 year'"
+            time_filter = "day >= CURRENT_DATE - INTERVAL '1 year'"
         elif period == "quarter":
-            time_filter = "WHERE d.created_at >= CURRENT_DATE - INTERVAL '3 months'"
+            time_filter = "day >= CURRENT_DATE - INTERVAL '3 months'"
         elif period == "month":
-            time_filter = "WHERE d.created_at >= CURRENT_DATE - INTERVAL '1 month'"
+            time_filter = "day >= CURRENT_DATE - INTERVAL '1 month'"
         
+        # Repeat purchase rate: share of customers with more than one deal in the category
         supplement_performance = f"""
+            WITH sales AS (
+                SELECT 
+                    product_category,
+                    SUM(deal_count) as total_sales,
+                    SUM(amount_sum) as revenue,
+                    SUM(CASE WHEN status = 'won' THEN deal_count ELSE 0 END) as won_sales
+                FROM deal_daily_rollups
+                WHERE {time_filter}
+                GROUP BY product_category
+            ),
+            purchases AS (
+                SELECT product_category, client_id, SUM(deal_count) as purchase_count
+                FROM deal_daily_rollup_clients
+                WHERE {time_filter}
+                GROUP BY product_category, client_id
+            ),
+            customers AS (
+                SELECT 
+                    product_category,
+                    COUNT(*) as unique_customers,
+                    COUNT(CASE WHEN purchase_count > 1 THEN 1 END) as repeat_customers
+                FROM purchases
+                GROUP BY product_category
+            )
             SELECT 
-                d.product_category,
-                COUNT(d.id) as total_sales,
-                COALESCE(SUM(d.amount), 0) as revenue
-                COUNT(DISTINCT c.id) as unique_customers,
-                COUNT(CASE WHEN d.status = 'won' THEN 1 END)::float / COUNT(d.id) * 100 as conversion_rate,
-                AVG(d.amount) as avg_order_value,
-                COUNT(CASE WHEN d2.id IS NOT NULL THEN 1 END)::float / COUNT(DISTINCT c.id) * 100 as repeat_purchase_rate
-            FROM deals d
-            LEFT JOIN clients c ON c.id = d.client_id
-            LEFT JOIN deals d2 ON d2.client_id = c.id 
-                AND d2.product_category = d.product_category 
-                AND d2.created_at > d.created_at
-            GROUP BY d.product_category
+                NULLIF(s.product_category, '') as product_category,
+                s.total_sales,
+                s.revenue,
+                COALESCE(cu.unique_customers, 0) as unique_customers,
+                s.won_sales::float / NULLIF(s.total_sales, 0) * 100 as conversion_rate,
+                s.revenue / NULLIF(s.total_sales, 0) as avg_order_value,
+                cu.repeat_customers::float / NULLIF(cu.unique_customers, 0) * 100 as repeat_purchase_rate
+            FROM sales s
+            LEFT JOIN customers cu ON cu.product_category = s.product_category
             ORDER BY revenue DESC
         """
         
-        sport_preferences = """
+        sport_preferences = f"""
+            WITH won AS (
+                SELECT 
+                    sport,
+                    product_category,
+                    SUM(deal_count) as sales_count,
+                    SUM(amount_sum) as total_revenue
+                FROM deal_daily_rollups
+                WHERE status = 'won' AND {time_filter}
+                GROUP BY sport, product_category
+            ),
+            athletes AS (
+                SELECT sport, product_category, COUNT(DISTINCT client_id) as unique_athletes
+                FROM deal_daily_rollup_clients
+                WHERE status = 'won' AND {time_filter}
+                GROUP BY sport, product_category
+            )
             SELECT 
-                c.sport,
-                d.product_category,
-                COUNT(d.id) as sales_count,
-                COALESCE(SUM(d.amount), 0) as total_revenue,
-                COUNT(DISTINCT c.id) as unique_athletes,
-                AVG(d.amount) as avg_athlete_spend
-            FROM clients c
-            JOIN deals d ON d.client_id = c.id
-            WHERE d.status = 'won'
-            GROUP BY c.sport, d.product_category
+                NULLIF(w.sport, '') as sport,
+                NULLIF(w.product_category, '') as product_category,
+                w.sales_count,
+                w.total_revenue,
+                COALESCE(a.unique_athletes, 0) as unique_athletes,
+                w.total_revenue / NULLIF(w.sales_count, 0) as avg_athlete_spend
+            FROM won w
+            LEFT JOIN athletes a ON a.sport = w.sport AND a.product_category = w.product_category
             ORDER BY total_revenue DESC
         """
         
-        supplement_data = db.execute(text(supplement_performance)).fetchall()
-        preferences_data = db.execute(text(sport_preferences)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("supplement_data", supplement_performance)
+            .add("preferences_data", sport_preferences)
+            .run()
+        )
+        supplement_data = grouped["supplement_data"]
+        preferences_data = grouped["preferences_data"]
         
         if not supplement_data and not preferences_data:
             raise HTTPException(
@@ -357,7 +450,7 @@ async def get_supplement_analytics(
                         "total_sales": row[1],
                         "revenue": float(row[2]),
                         "unique_customers": row[3],
-                        "conversion_rate": float(row[4]),
+                        "conversion_rate": float(row[4] or 0),
                         "avg_order_value": float(row[5] or 0),
                         "repeat_purchase_rate": float(row[6] or 0)
                     } for row in supplement_data
@@ -375,6 +468,9 @@ async def get_supplement_analytics(
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -386,7 +482,7 @@ async def get_supplement_analytics(
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_seasonal_trends(db: Session = Depends(get_db)):
+async def get_seasonal_trends(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         seasonal_analysis = """
             SELECT 
@@ -396,41 +492,31 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                 COALESCE(SUM(d.amount), 0) as revenue,
                 COUNT(DISTINCT c.id) as unique_buyers,
                 c.sport as primary_sport,
-                AVG(d.amount) as avg_order_value,
-                COUNT(CASE WHEN d2.id IS NOT NULL THEN 1 END) as repeat_orders
+                AVG(d.amount) as avg_order_value
             FROM deals d
             JOIN clients c ON c.id = d.client_id
-            LEFT JOIN deals d2 ON d2.client_id = c.id 
-                AND d2.product_category = d.product_category
-                AND d2.created_at > d.created_at
-                AND d2.created_at <= d.created_at + INTERVAL '30 days'
             WHERE d.status = 'won'
             GROUP BY EXTRACT(MONTH FROM d.created_at), d.product_category, c.sport
             ORDER BY month, revenue DESC
         """
         
-        popular_combinations = """
-            SELECT 
-                d1.product_category as product1,
-                d2.product_category as product2,
-                COUNT(*) as combination_count,
-                c.sport,
-                EXTRACT(MONTH FROM d1.created_at) as month,
-                AVG(d1.amount + d2.amount) as avg_combo_value
-            FROM deals d1
-            JOIN deals d2 ON d1.client_id = d2.client_id 
-                AND d1.id < d2.id 
-                AND d1.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at <= d1.created_at + INTERVAL '30 days'
-            JOIN clients c ON c.id = d1.client_id
-            WHERE d1.status = 'won' AND d2.status = 'won'
-            GROUP BY d1.product_category, d2.product_category, c.sport, EXTRACT(MONTH FROM d1.created_at)
-            ORDER BY month, combination_count DESC
-        """
-        
-        seasonal_data = db.execute(text(seasonal_analysis)).fetchall()
-        combinations_data = db.execute(text(popular_combinations)).fetchall()
+        # Windowed pair counts come from one ordered pass over won deals
+        repeat_orders = RepeatOrders(timedelta(days=30))
+        combinations = PairCombinations(timedelta(days=30), since=date.today() - timedelta(days=365))
+        grouped = await (
+            QueryGroup(db)
+            .add("seasonal_data", seasonal_analysis)
+            .add_call("pairs", lambda session: sweep_won_deals(session, repeat_orders, combinations))
+            .run()
+        )
+        seasonal_data = grouped["seasonal_data"]
+        combinations_data = sorted(
+            (
+                (product1, product2, count, sport, month, amount / count)
+                for (product1, product2, sport, month), (count, amount) in combinations.pairs.items()
+            ),
+            key=lambda row: (row[4], -row[2])
+        )
         
         if not seasonal_data and not combinations_data:
             raise HTTPException(
@@ -450,7 +536,7 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                         "unique_buyers": row[4],
                         "primary_sport": row[5],
                         "avg_order_value": float(row[6] or 0),
-                        "repeat_orders": row[7]
+                        "repeat_orders": repeat_orders.counts.get((int(row[0]), row[1], row[5]), 0)
                     } for row in seasonal_data
                 ],
                 "popular_combinations": [
@@ -466,6 +552,9 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -477,7 +566,7 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_reorder_analytics(db: Session = Depends(get_db)):
+async def get_reorder_analytics(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         reorder_metrics = """
             WITH customer_orders AS (
@@ -506,23 +595,23 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
             ORDER BY returning_customers DESC
         """
         
-        retention_analysis = """
-            SELECT 
-                d1.product_category,
-                COUNT(DISTINCT d1.client_id) as initial_customers,
-                COUNT(DISTINCT d2.client_id) as retained_customers,
-                COUNT(DISTINCT d2.client_id)::float / COUNT(DISTINCT d1.client_id) * 100 as retention_rate
-            FROM deals d1
-            LEFT JOIN deals d2 ON d1.client_id = d2.client_id 
-                AND d2.created_at > d1.created_at
-                AND d2.created_at <= d1.created_at + INTERVAL '3 months'
-                AND d2.product_category = d1.product_category
-            WHERE d1.status = 'won'
-            GROUP BY d1.product_category
-        """
-        
-        reorder_data = db.execute(text(reorder_metrics)).fetchall()
-        retention_data = db.execute(text(retention_analysis)).fetchall()
+        # Clients who bought the category again within 3 months (90 days)
+        retention = CategoryRetention(timedelta(days=90))
+        grouped = await (
+            QueryGroup(db)
+            .add("reorder_data", reorder_metrics)
+            .add_call("retention", lambda session: sweep_won_deals(session, retention))
+            .run()
+        )
+        reorder_data = grouped["reorder_data"]
+        retention_data = [
+            (
+                category,
+                initial,
+                retention.retained[category],
+                retention.retained[category] / initial * 100
+            ) for category, initial in retention.initial.items()
+        ]
         
         if not reorder_data and not retention_data:
             raise HTTPException(
@@ -554,6 +643,9 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -566,7 +658,7 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
         404: {"model": ErrorResponse, "description": "No data found"}
     })
 async def get_inventory_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     skip: int = 0,
     limit: int = 100
 ):
@@ -602,8 +694,14 @@ async def get_inventory_analytics(
             GROUP BY p.product_category, p.name
         """
         
-        stock_data = db.execute(text(stock_metrics)).fetchall()
-        restock_data = db.execute(text(restock_analysis)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("stock_data", stock_metrics)
+            .add("restock_data", restock_analysis)
+            .run()
+        )
+        stock_data = grouped["stock_data"]
+        restock_data = grouped["restock_data"]
         
         if not stock_data and not restock_data:
             raise HTTPException(
@@ -639,6 +737,9 @@ async def get_inventory_analytics(
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -650,7 +751,7 @@ async def get_inventory_analytics(
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "Client not found"}
     })
-async def get_client_recommendations(client_id: int, db: Session = Depends(get_db)):
+async def get_client_recommendations(client_id: int, db: AsyncSession = Depends(get_async_replica_db)):
     try:
         # Get client's purchase history and preferences
         client_profile = """
@@ -703,15 +804,23 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             LIMIT 3
         """
         
-        profile = db.execute(text(client_profile), {"client_id": client_id}).fetchone()
+        params = {"client_id": client_id}
+        grouped = await (
+            QueryGroup(db)
+            .add("profile", client_profile, params, first=True)
+            .add("related", related_supplements, params)
+            .add("trending", trending_supplements, params)
+            .run()
+        )
+        profile = grouped["profile"]
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Client not found"
             )
         
-        related = db.execute(text(related_supplements), {"client_id": client_id}).fetchall()
-        trending = db.execute(text(trending_supplements), {"client_id": client_id}).fetchall()
+        related = grouped["related"]
+        trending = grouped["trending"]
         
         return {
             "success": True,
@@ -740,6 +849,9 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -751,7 +863,7 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_customer_segments(db: Session = Depends(get_db)):
+async def get_customer_segments(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         customer_segments = """
             WITH customer_metrics AS (
@@ -784,7 +896,7 @@ async def get_customer_segments(db: Session = Depends(get_db)):
                 END
         """
         
-        results = db.execute(text(customer_segments)).fetchall()
+        results = (await db.execute(text(customer_segments))).fetchall()
         
         if not results:
             raise HTTPException(
@@ -816,7 +928,7 @@ async def get_customer_segments(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_seasonal_trends(db: Session = Depends(get_db)):
+async def get_seasonal_trends(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         seasonal_analysis = """
             SELECT 
@@ -826,41 +938,31 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                 COALESCE(SUM(d.amount), 0) as revenue,
                 COUNT(DISTINCT c.id) as unique_buyers,
                 c.sport as primary_sport,
-                AVG(d.amount) as avg_order_value,
-                COUNT(CASE WHEN d2.id IS NOT NULL THEN 1 END) as repeat_orders
+                AVG(d.amount) as avg_order_value
             FROM deals d
             JOIN clients c ON c.id = d.client_id
-            LEFT JOIN deals d2 ON d2.client_id = c.id 
-                AND d2.product_category = d.product_category
-                AND d2.created_at > d.created_at
-                AND d2.created_at <= d.created_at + INTERVAL '30 days'
             WHERE d.status = 'won'
             GROUP BY EXTRACT(MONTH FROM d.created_at), d.product_category, c.sport
             ORDER BY month, revenue DESC
         """
         
-        popular_combinations = """
-            SELECT 
-                d1.product_category as product1,
-                d2.product_category as product2,
-                COUNT(*) as combination_count,
-                c.sport,
-                EXTRACT(MONTH FROM d1.created_at) as month,
-                AVG(d1.amount + d2.amount) as avg_combo_value
-            FROM deals d1
-            JOIN deals d2 ON d1.client_id = d2.client_id 
-                AND d1.id < d2.id 
-                AND d1.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at <= d1.created_at + INTERVAL '30 days'
-            JOIN clients c ON c.id = d1.client_id
-            WHERE d1.status = 'won' AND d2.status = 'won'
-            GROUP BY d1.product_category, d2.product_category, c.sport, EXTRACT(MONTH FROM d1.created_at)
-            ORDER BY month, combination_count DESC
-        """
-        
-        seasonal_data = db.execute(text(seasonal_analysis)).fetchall()
-        combinations_data = db.execute(text(popular_combinations)).fetchall()
+        # Windowed pair counts come from one ordered pass over won deals
+        repeat_orders = RepeatOrders(timedelta(days=30))
+        combinations = PairCombinations(timedelta(days=30), since=date.today() - timedelta(days=365))
+        grouped = await (
+            QueryGroup(db)
+            .add("seasonal_data", seasonal_analysis)
+            .add_call("pairs", lambda session: sweep_won_deals(session, repeat_orders, combinations))
+            .run()
+        )
+        seasonal_data = grouped["seasonal_data"]
+        combinations_data = sorted(
+            (
+                (product1, product2, count, sport, month, amount / count)
+                for (product1, product2, sport, month), (count, amount) in combinations.pairs.items()
+            ),
+            key=lambda row: (row[4], -row[2])
+        )
         
         if not seasonal_data and not combinations_data:
             raise HTTPException(
@@ -880,7 +982,7 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                         "unique_buyers": row[4],
                         "primary_sport": row[5],
                         "avg_order_value": float(row[6] or 0),
-                        "repeat_orders": row[7]
+                        "repeat_orders": repeat_orders.counts.get((int(row[0]), row[1], row[5]), 0)
                     } for row in seasonal_data
                 ],
                 "popular_combinations": [
@@ -896,6 +998,9 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -907,7 +1012,7 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
     })
-async def get_reorder_analytics(db: Session = Depends(get_db)):
+async def get_reorder_analytics(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         reorder_metrics = """
             WITH customer_orders AS (
@@ -936,23 +1041,23 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
             ORDER BY returning_customers DESC
         """
         
-        retention_analysis = """
-            SELECT 
-                d1.product_category,
-                COUNT(DISTINCT d1.client_id) as initial_customers,
-                COUNT(DISTINCT d2.client_id) as retained_customers,
-                COUNT(DISTINCT d2.client_id)::float / COUNT(DISTINCT d1.client_id) * 100 as retention_rate
-            FROM deals d1
-            LEFT JOIN deals d2 ON d1.client_id = d2.client_id 
-                AND d2.created_at > d1.created_at
-                AND d2.created_at <= d1.created_at + INTERVAL '3 months'
-                AND d2.product_category = d1.product_category
-            WHERE d1.status = 'won'
-            GROUP BY d1.product_category
-        """
-        
-        reorder_data = db.execute(text(reorder_metrics)).fetchall()
-        retention_data = db.execute(text(retention_analysis)).fetchall()
+        # Clients who bought the category again within 3 months (90 days)
+        retention = CategoryRetention(timedelta(days=90))
+        grouped = await (
+            QueryGroup(db)
+            .add("reorder_data", reorder_metrics)
+            .add_call("retention", lambda session: sweep_won_deals(session, retention))
+            .run()
+        )
+        reorder_data = grouped["reorder_data"]
+        retention_data = [
+            (
+                category,
+                initial,
+                retention.retained[category],
+                retention.retained[category] / initial * 100
+            ) for category, initial in retention.initial.items()
+        ]
         
         if not reorder_data and not retention_data:
             raise HTTPException(
@@ -984,6 +1089,9 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -996,7 +1104,7 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
         404: {"model": ErrorResponse, "description": "No data found"}
     })
 async def get_inventory_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     skip: int = 0,
     limit: int = 100
 ):
@@ -1032,8 +1140,14 @@ async def get_inventory_analytics(
             GROUP BY p.product_category, p.name
         """
         
-        stock_data = db.execute(text(stock_metrics)).fetchall()
-        restock_data = db.execute(text(restock_analysis)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("stock_data", stock_metrics)
+            .add("restock_data", restock_analysis)
+            .run()
+        )
+        stock_data = grouped["stock_data"]
+        restock_data = grouped["restock_data"]
         
         if not stock_data and not restock_data:
             raise HTTPException(
@@ -1069,6 +1183,9 @@ async def get_inventory_analytics(
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1080,7 +1197,7 @@ async def get_inventory_analytics(
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "Client not found"}
     })
-async def get_client_recommendations(client_id: int, db: Session = Depends(get_db)):
+async def get_client_recommendations(client_id: int, db: AsyncSession = Depends(get_async_replica_db)):
     try:
         # Get client's purchase history and preferences
         client_profile = """
@@ -1133,15 +1250,23 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             LIMIT 3
         """
         
-        profile = db.execute(text(client_profile), {"client_id": client_id}).fetchone()
+        params = {"client_id": client_id}
+        grouped = await (
+            QueryGroup(db)
+            .add("profile", client_profile, params, first=True)
+            .add("related", related_supplements, params)
+            .add("trending", trending_supplements, params)
+            .run()
+        )
+        profile = grouped["profile"]
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Client not found"
             )
         
-        related = db.execute(text(related_supplements), {"client_id": client_id}).fetchall()
-        trending = db.execute(text(trending_supplements), {"client_id": client_id}).fetchall()
+        related = grouped["related"]
+        trending = grouped["trending"]
         
         return {
             "success": True,
@@ -1170,6 +1295,9 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
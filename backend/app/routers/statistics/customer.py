@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from ...database import get_db
+from ...database import get_async_replica_db
+from ...utils.query_group import QueryGroup
 from ...schemas.statistics import StatisticsResponse, ErrorResponse
 from ...services.recommender import RecommenderService
-from ...services.cache import CacheService
+from ...services.cache import cached
+from ...utils.conditional import conditional
 
 router = APIRouter()
 
@@ -13,21 +15,11 @@ router = APIRouter()
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
-    })
-@router.get("/customer-segments")
-async def get_customer_segments(db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", namespace="stats", max_age=60))])
+@cached("customer_segments", ttl=86400, tags=["clients", "deals"], namespace="stats")
+async def get_customer_segments(db: AsyncSession = Depends(get_async_replica_db)):
     try:
-        # Check cache first
-        cache_key = "customer_segments"
-        cached_data = CacheService.get(cache_key)
-        
-        if cached_data:
-            return {
-                "success": True,
-                "data": cached_data,
-                "error": None
-            }
-            
         customer_segments = """
             WITH customer_metrics AS (
                 SELECT 
@@ -59,7 +51,7 @@ async def get_customer_segments(db: Session = Depends(get_db)):
                 END
         """
         
-        results = db.execute(text(customer_segments)).fetchall()
+        results = (await db.execute(text(customer_segments))).fetchall()
         
         if not results:
             raise HTTPException(
@@ -91,8 +83,9 @@ async def get_customer_segments(db: Session = Depends(get_db)):
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "Client not found"}
-    })
-async def get_client_recommendations(client_id: int, db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", max_age=60))])
+async def get_client_recommendations(client_id: int, db: AsyncSession = Depends(get_async_replica_db)):
     try:
         client_profile = """
             SELECT 
@@ -142,15 +135,23 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             LIMIT 3
         """
         
-        profile = db.execute(text(client_profile), {"client_id": client_id}).fetchone()
+        params = {"client_id": client_id}
+        grouped = await (
+            QueryGroup(db)
+            .add("profile", client_profile, params, first=True)
+            .add("related", related_supplements, params)
+            .add("trending", trending_supplements, params)
+            .run()
+        )
+        profile = grouped["profile"]
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Client not found"
             )
         
-        related = db.execute(text(related_supplements), {"client_id": client_id}).fetchall()
-        trending = db.execute(text(trending_supplements), {"client_id": client_id}).fetchall()
+        related = grouped["related"]
+        trending = grouped["trending"]
         
         return {
             "success": True,
@@ -179,34 +180,30 @@ async def get_client_recommendations(client_id: int, db: Session = Depends(get_d
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating recommendations: {str(e)}"
         )
 
+# Recommendations read other clients' deals and the catalog, and churn risk
+# moves with CURRENT_DATE, hence the shared tags and the hourly TTL
 @router.get("/client-insights/{client_id}",
     response_model=StatisticsResponse,
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "Client not found"}
-    })
-async def get_client_insights(client_id: int, db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("client:{client_id}", "deals", "products", namespace="stats", max_age=60))])
+@cached("client_insights_{client_id}", ttl=3600, tags=["client:{client_id}", "deals", "products"], namespace="stats")
+async def get_client_insights(client_id: int, db: AsyncSession = Depends(get_async_replica_db)):
     try:
-        # Check cache first
-        cache_key = f"client_insights_{client_id}"
-        cached_data = CacheService.get(cache_key)
-        
-        if cached_data:
-            return {
-                "success": True,
-                "data": cached_data,
-                "error": None
-            }
-
         # Get recommendations
         recommender = RecommenderService(db)
-        product_recommendations = recommender.get_product_recommendations(client_id)
+        product_recommendations = await recommender.get_product_recommendations(client_id)
 
         # Get client profile and history
         client_query = """
@@ -223,7 +220,7 @@ async def get_client_insights(client_id: int, db: Session = Depends(get_db)):
             GROUP BY c.id, c.name, c.sport
         """
         
-        client_data = db.execute(text(client_query), {"client_id": client_id}).fetchone()
+        client_data = (await db.execute(text(client_query), {"client_id": client_id})).fetchone()
         
         if not client_data:
             raise HTTPException(
@@ -244,30 +241,6 @@ async def get_client_insights(client_id: int, db: Session = Depends(get_db)):
         }
 
         # Add purchase prediction and churn analysis
-        prediction = db.execute(text(next_purchase_query), {"client_id": client_id}).fetchone()
-        churn_data = db.execute(text(churn_query), {"client_id": client_id}).fetchone()
-        
-        response_data.update({
-            "purchase_prediction": {
-                "avg_days_between_purchases": float(prediction[0]) if prediction and prediction[0] else None,
-                "predicted_next_purchase": prediction[1].strftime("%Y-%m-%d") if prediction and prediction[1] else None
-            },
-            "churn_analysis": {
-                "risk_level": churn_data[0] if churn_data else "Unknown",
-                "days_inactive": churn_data[1].days if churn_data and churn_data[1] else None
-            }
-        })
-
-        # Cache for 1 hour
-        CacheService.set(cache_key, response_data, 3600)
-
-        return {
-            "success": True,
-            "data": response_data,
-            "error": None
-        }
-
-        # Add purchase prediction
         next_purchase_query = """
             WITH purchase_intervals AS (
                 SELECT 
@@ -286,33 +259,47 @@ async def get_client_insights(client_id: int, db: Session = Depends(get_db)):
             FROM purchase_intervals
             WHERE client_id = :client_id AND days_between IS NOT NULL
         """
+
+        churn_query = """
+            SELECT 
+                CASE 
+                    WHEN MAX(d.created_at) < CURRENT_DATE - INTERVAL '90 days' THEN 'High'
+                    WHEN MAX(d.created_at) < CURRENT_DATE - INTERVAL '60 days' THEN 'Medium'
+                    ELSE 'Low'
+                END as churn_risk,
+                CURRENT_DATE - MAX(d.created_at) as days_since_last_purchase
+            FROM deals d
+            WHERE d.client_id = :client_id AND d.status = 'won'
+        """
+
+        grouped = await (
+            QueryGroup(db)
+            .add("prediction", next_purchase_query, {"client_id": client_id}, first=True)
+            .add("churn_data", churn_query, {"client_id": client_id}, first=True)
+            .run()
+        )
+        prediction = grouped["prediction"]
+        churn_data = grouped["churn_data"]
         
-        prediction = db.execute(text(next_purchase_query), {"client_id": client_id}).fetchone()
-        
-        response_data["purchase_prediction"] = {
-            "avg_days_between_purchases": float(prediction[0]) if prediction[0] else None,
-            "predicted_next_purchase": prediction[1].strftime("%Y-%m-%d") if prediction[1] else None
-        }
+        response_data.update({
+            "purchase_prediction": {
+                "avg_days_between_purchases": float(prediction[0]) if prediction and prediction[0] else None,
+                "predicted_next_purchase": prediction[1].strftime("%Y-%m-%d") if prediction and prediction[1] else None
+            },
+            "churn_analysis": {
+                "risk_level": churn_data[0] if churn_data else "Unknown",
+                "days_inactive": churn_data[1].days if churn_data and churn_data[1] else None
+            }
+        })
 
-        # Add to client-insights endpoint
-                churn_query = """
-                    SELECT 
-                        CASE 
-                            WHEN MAX(d.created_at) < CURRENT_DATE - INTERVAL '90 days' THEN 'High'
-                            WHEN MAX(d.created_at) < CURRENT_DATE - INTERVAL '60 days' THEN 'Medium'
-                            ELSE 'Low'
-                        END as churn_risk,
-                        CURRENT_DATE - MAX(d.created_at) as days_since_last_purchase
-                    FROM deals d
-                    WHERE d.client_id = :client_id AND d.status = 'won'
-                """
-                
-                churn_data = db.execute(text(churn_query), {"client_id": client_id}).fetchone()
-                
-                response_data["churn_analysis"] = {
-                    "risk_level": churn_data[0] if churn_data else "Unknown",
-                    "days_inactive": churn_data[1].days if churn_data and churn_data[1] else None
-                }
+        return {
+            "success": True,
+            "data": response_data,
+            "error": None
+        }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
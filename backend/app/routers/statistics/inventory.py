@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from ...database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...database import get_async_replica_db
+from ...utils.query_group import QueryGroup
 from ...schemas.statistics import StatisticsResponse, ErrorResponse
 
 router = APIRouter()
@@ -13,7 +13,7 @@ router = APIRouter()
         404: {"model": ErrorResponse, "description": "No data found"}
     })
 async def get_inventory_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     skip: int = 0,
     limit: int = 100
 ):
@@ -50,8 +50,14 @@ async def get_inventory_analytics(
             GROUP BY p.product_category, p.name
         """
         
-        stock_data = db.execute(text(stock_metrics), {"limit": limit, "skip": skip}).fetchall()
-        restock_data = db.execute(text(restock_analysis)).fetchall()
+        grouped = await (
+            QueryGroup(db)
+            .add("stock_data", stock_metrics, {"limit": limit, "skip": skip})
+            .add("restock_data", restock_analysis)
+            .run()
+        )
+        stock_data = grouped["stock_data"]
+        restock_data = grouped["restock_data"]
         
         if not stock_data and not restock_data:
             raise HTTPException(
@@ -87,6 +93,9 @@ async def get_inventory_analytics(
             },
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
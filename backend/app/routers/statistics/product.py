@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from ...database import get_db
+from ...database import get_async_replica_db
 from ...schemas.statistics import StatisticsResponse, ErrorResponse
+from ...utils.conditional import conditional
 
 router = APIRouter()
 
@@ -11,24 +12,47 @@ router = APIRouter()
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
-    })
-async def get_product_analytics(db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", "products", max_age=60))])
+async def get_product_analytics(db: AsyncSession = Depends(get_async_replica_db)):
     try:
+        # Won totals come from the daily rollups instead of joining every deal;
+        # deals are attributed to categories through product_id, as before
         product_metrics = """
+            WITH sold AS (
+                SELECT 
+                    r.product_id,
+                    SUM(r.quantity_sum) as units_sold,
+                    SUM(r.amount_sum) as revenue,
+                    SUM(r.deal_count) as sales
+                FROM deal_daily_rollups r
+                WHERE r.status = 'won'
+                GROUP BY r.product_id
+            ),
+            customers AS (
+                SELECT 
+                    p.category,
+                    COUNT(DISTINCT rc.client_id) as unique_customers
+                FROM deal_daily_rollup_clients rc
+                JOIN products p ON p.id = rc.product_id
+                WHERE rc.status = 'won'
+                GROUP BY p.category
+            )
             SELECT 
                 p.category,
-                COUNT(DISTINCT p.id) as product_count,
-                SUM(d.quantity) as total_units_sold,
-                AVG(d.amount) as avg_price,
-                COUNT(DISTINCT d.client_id) as unique_customers,
-                COUNT(DISTINCT d.id) as total_sales
+                COUNT(p.id) as product_count,
+                SUM(s.units_sold) as total_units_sold,
+                SUM(s.revenue) / NULLIF(SUM(s.sales), 0) as avg_price,
+                COALESCE(MAX(cu.unique_customers), 0) as unique_customers,
+                COALESCE(SUM(s.sales), 0) as total_sales
             FROM products p
-            LEFT JOIN deals d ON d.product_id = p.id AND d.status = 'won'
+            LEFT JOIN sold s ON s.product_id = p.id
+            LEFT JOIN customers cu ON cu.category IS NOT DISTINCT FROM p.category
             GROUP BY p.category
             ORDER BY total_units_sold DESC
         """
         
-        results = db.execute(text(product_metrics)).fetchall()
+        results = (await db.execute(text(product_metrics))).fetchall()
         
         if not results:
             raise HTTPException(
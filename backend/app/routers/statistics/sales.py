@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from ...database import get_db
+from ...database import get_async_replica_db
 from ...schemas.statistics import StatisticsResponse, ErrorResponse
+from ...utils.conditional import conditional
 
 router = APIRouter()
 
@@ -11,24 +12,43 @@ router = APIRouter()
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
-    })
-async def get_sales_summary(db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", max_age=60))])
+async def get_sales_summary(db: AsyncSession = Depends(get_async_replica_db)):
     try:
+        # Reads the daily rollups (services/rollups.py), so cost scales with days
         sales_query = """
+            WITH monthly AS (
+                SELECT 
+                    DATE_TRUNC('month', r.day) as month,
+                    SUM(r.deal_count) as total_sales,
+                    SUM(r.amount_sum) as revenue
+                FROM deal_daily_rollups r
+                WHERE r.status = 'won'
+                    AND r.day >= CURRENT_DATE - INTERVAL '12 months'
+                GROUP BY DATE_TRUNC('month', r.day)
+            ),
+            customers AS (
+                SELECT 
+                    DATE_TRUNC('month', rc.day) as month,
+                    COUNT(DISTINCT rc.client_id) as unique_customers
+                FROM deal_daily_rollup_clients rc
+                WHERE rc.status = 'won'
+                    AND rc.day >= CURRENT_DATE - INTERVAL '12 months'
+                GROUP BY DATE_TRUNC('month', rc.day)
+            )
             SELECT 
-                DATE_TRUNC('month', d.created_at) as month,
-                COUNT(d.id) as total_sales,
-                SUM(d.amount) as revenue,
-                COUNT(DISTINCT d.client_id) as unique_customers,
-                AVG(d.amount) as avg_order_value
-            FROM deals d
-            WHERE d.status = 'won'
-                AND d.created_at >= CURRENT_DATE - INTERVAL '12 months'
-            GROUP BY DATE_TRUNC('month', d.created_at)
-            ORDER BY month DESC
+                m.month,
+                m.total_sales,
+                m.revenue,
+                COALESCE(cu.unique_customers, 0) as unique_customers,
+                m.revenue / NULLIF(m.total_sales, 0) as avg_order_value
+            FROM monthly m
+            LEFT JOIN customers cu ON cu.month = m.month
+            ORDER BY m.month DESC
         """
         
-        results = db.execute(text(sales_query)).fetchall()
+        results = (await db.execute(text(sales_query))).fetchall()
         
         if not results:
             raise HTTPException(
@@ -44,7 +64,7 @@ async def get_sales_summary(db: Session = Depends(get_db)):
                     "total_sales": row[1],
                     "revenue": float(row[2]),
                     "unique_customers": row[3],
-                    "avg_order_value": float(row[4])
+                    "avg_order_value": float(row[4] or 0)
                 } for row in results
             ],
             "error": None
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from ...database import get_db
+from ...database import get_async_replica_db
+from ...utils.query_group import QueryGroup
 from ...schemas.statistics import StatisticsResponse, ErrorResponse
-from ...services.cache import CacheService
+from ...services.cache import cached
+from ...utils.conditional import conditional
+from ...services.windowed_pairs import RepeatOrders, PairCombinations, sweep_won_deals
+from datetime import date, timedelta
 
 router = APIRouter()
 
@@ -12,21 +16,11 @@ router = APIRouter()
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
-    })
-async def get_seasonal_trends(db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", namespace="stats", max_age=300))])
+@cached("seasonal_trends", ttl=86400, tags=["clients", "deals"], namespace="stats")
+async def get_seasonal_trends(db: AsyncSession = Depends(get_async_replica_db)):
     try:
-        # Try to get from cache first
-        cache_key = "seasonal_trends"
-        cached_data = CacheService.get(cache_key)
-        
-        if cached_data:
-            return {
-                "success": True,
-                "data": cached_data,
-                "error": None
-            }
-
-        # If not in cache, query database
         seasonal_analysis = """
             SELECT 
                 EXTRACT(MONTH FROM d.created_at) as month,
@@ -35,41 +29,31 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                 COALESCE(SUM(d.amount), 0) as revenue,
                 COUNT(DISTINCT c.id) as unique_buyers,
                 c.sport as primary_sport,
-                AVG(d.amount) as avg_order_value,
-                COUNT(CASE WHEN d2.id IS NOT NULL THEN 1 END) as repeat_orders
+                AVG(d.amount) as avg_order_value
             FROM deals d
             JOIN clients c ON c.id = d.client_id
-            LEFT JOIN deals d2 ON d2.client_id = c.id 
-                AND d2.product_category = d.product_category
-                AND d2.created_at > d.created_at
-                AND d2.created_at <= d.created_at + INTERVAL '30 days'
             WHERE d.status = 'won'
             GROUP BY EXTRACT(MONTH FROM d.created_at), d.product_category, c.sport
             ORDER BY month, revenue DESC
         """
         
-        popular_combinations = """
-            SELECT 
-                d1.product_category as product1,
-                d2.product_category as product2,
-                COUNT(*) as combination_count,
-                c.sport,
-                EXTRACT(MONTH FROM d1.created_at) as month,
-                AVG(d1.amount + d2.amount) as avg_combo_value
-            FROM deals d1
-            JOIN deals d2 ON d1.client_id = d2.client_id 
-                AND d1.id < d2.id 
-                AND d1.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at >= CURRENT_DATE - INTERVAL '12 months'
-                AND d2.created_at <= d1.created_at + INTERVAL '30 days'
-            JOIN clients c ON c.id = d1.client_id
-            WHERE d1.status = 'won' AND d2.status = 'won'
-            GROUP BY d1.product_category, d2.product_category, c.sport, EXTRACT(MONTH FROM d1.created_at)
-            ORDER BY month, combination_count DESC
-        """
-        
-        seasonal_data = db.execute(text(seasonal_analysis)).fetchall()
-        combinations_data = db.execute(text(popular_combinations)).fetchall()
+        # Windowed pair counts come from one ordered pass over won deals
+        repeat_orders = RepeatOrders(timedelta(days=30))
+        combinations = PairCombinations(timedelta(days=30), since=date.today() - timedelta(days=365))
+        grouped = await (
+            QueryGroup(db)
+            .add("seasonal_data", seasonal_analysis)
+            .add_call("pairs", lambda session: sweep_won_deals(session, repeat_orders, combinations))
+            .run()
+        )
+        seasonal_data = grouped["seasonal_data"]
+        combinations_data = sorted(
+            (
+                (product1, product2, count, sport, month, amount / count)
+                for (product1, product2, sport, month), (count, amount) in combinations.pairs.items()
+            ),
+            key=lambda row: (row[4], -row[2])
+        )
         
         if not seasonal_data and not combinations_data:
             raise HTTPException(
@@ -77,7 +61,6 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                 detail="No seasonal trends data found"
             )
         
-        # Store in cache for 1 hour
         response_data = {
             "seasonal_patterns": [
                 {
@@ -88,7 +71,7 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
                     "unique_buyers": row[4],
                     "primary_sport": row[5],
                     "avg_order_value": float(row[6] or 0),
-                    "repeat_orders": row[7]
+                    "repeat_orders": repeat_orders.counts.get((int(row[0]), row[1], row[5]), 0)
                 } for row in seasonal_data
             ],
             "popular_combinations": [
@@ -103,13 +86,14 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
             ]
         }
         
-        CacheService.set(cache_key, response_data, 3600)  # Cache for 1 hour
-        
         return {
             "success": True,
             "data": response_data,
             "error": None
         }
+    except HTTPException:
+        # Keep QueryGroup's 504 instead of masking it as a 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -121,8 +105,9 @@ async def get_seasonal_trends(db: Session = Depends(get_db)):
     responses={
         500: {"model": ErrorResponse, "description": "Database error"},
         404: {"model": ErrorResponse, "description": "No data found"}
-    })
-async def get_reorder_analytics(db: Session = Depends(get_db)):
+    },
+    dependencies=[Depends(conditional("clients", "deals", max_age=300))])
+async def get_reorder_analytics(db: AsyncSession = Depends(get_async_replica_db)):
     try:
         reorder_metrics = """
             WITH customer_orders AS (
@@ -151,7 +136,7 @@ async def get_reorder_analytics(db: Session = Depends(get_db)):
             ORDER BY total_customers DESC
         """
         
-        results = db.execute(text(reorder_metrics)).fetchall()
+        results = (await db.execute(text(reorder_metrics))).fetchall()
         
         if not results:
             raise HTTPException(
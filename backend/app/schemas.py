@@ -1,8 +1,14 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from datetime import datetime
 from typing import Optional, List
 from .models import DealStage
 
+def _reject_null(value):
+    # PATCH fields may be omitted, but an explicit null can't be stored
+    if value is None:
+        raise ValueError("must not be null")
+    return value
+
 class ClientBase(BaseModel):
     name: str
     email: EmailStr
@@ -12,6 +18,14 @@ class ClientBase(BaseModel):
 class ClientCreate(ClientBase):
     pass
 
+class ClientUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    company: Optional[str] = None
+
+    _not_null = field_validator("name", "email")(_reject_null)
+
 class Client(ClientBase):
     id: int
     created_at: datetime
@@ -26,6 +40,13 @@ class DealBase(BaseModel):
 class DealCreate(DealBase):
     client_id: int
 
+class DealUpdate(BaseModel):
+    amount: Optional[float] = None
+    stage: Optional[DealStage] = None
+    client_id: Optional[int] = None
+
+    _not_null = field_validator("amount", "stage", "client_id")(_reject_null)
+
 class Deal(DealBase):
     id: int
     client_id: int
@@ -41,6 +62,13 @@ class ActivityBase(BaseModel):
 class ActivityCreate(ActivityBase):
     deal_id: int
 
+class ActivityUpdate(BaseModel):
+    type: Optional[str] = None
+    description: Optional[str] = None
+    deal_id: Optional[int] = None
+
+    _not_null = field_validator("type", "description", "deal_id")(_reject_null)
+
 class Activity(ActivityBase):
     id: int
     deal_id: int
@@ -49,6 +77,23 @@ class Activity(ActivityBase):
     class Config:
         from_attributes = True
 
+class BulkItemResult(BaseModel):
+    index: int
+    success: bool
+    id: Optional[int] = None
+    action: Optional[str] = None  # "created" or "updated"
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+class MeliSyncRequest(BaseModel):
+    product_ids: Optional[List[int]] = None
+    changed_since: Optional[datetime] = None
+    concurrency: Optional[int] = None
+
 class UserBase(BaseModel):
     email: EmailStr
     username: str
@@ -1,6 +1,9 @@
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, Dict, Any
+from ..database import run_write
+import json
 
 class AuditService:
     def __init__(self, db: Session):
@@ -24,15 +27,12 @@ class AuditService:
             )
         """
         
-        self.db.execute(
-            text(query),
-            {
-                "user_id": user_id,
-                "action": action,
-                "resource_type": resource_type,
-                "resource_id": resource_id,
-                "details": json.dumps(details),
-                "created_at": datetime.utcnow()
-            }
-        )
-        self.db.commit()
\ No newline at end of file
+        params = {
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": json.dumps(details),
+            "created_at": datetime.utcnow()
+        }
+        run_write(self.db, lambda session: session.execute(text(query), params))
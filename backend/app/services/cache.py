@@ -1,25 +1,865 @@
 from redis import Redis
-from typing import Any, Optional
+from redis.asyncio import BlockingConnectionPool, Redis as AsyncRedis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import functools
+import inspect
 import json
+import logging
+import math
 import os
+import random
+import threading
+import time
+import uuid
+from .cache_codec import CacheCodec
+from .cache_metrics import CacheMetrics
+from ..config import settings
+from ..utils.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Short timeouts and no client-side retries, so a slow or unreachable Redis
+# fails fast into the circuit breaker
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.25))
 
 redis_client = Redis(
     host=os.getenv('REDIS_HOST', 'localhost'),
     port=int(os.getenv('REDIS_PORT', 6379)),
     db=0,
-    decode_responses=True
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    retry=Retry(NoBackoff(), 0)
+)
+
+# The invalidation listener blocks reading messages, so it has its own
+# client without a read timeout
+pubsub_client = Redis(
+    host=os.getenv('REDIS_HOST', 'localhost'),
+    port=int(os.getenv('REDIS_PORT', 6379)),
+    db=0,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    health_check_interval=30
+)
+
+# Used by async code paths so Redis round trips don't block the event loop.
+# The blocking pool makes callers wait for a free connection instead of
+# failing when every connection is in use.
+async_redis_pool = BlockingConnectionPool(
+    host=os.getenv('REDIS_HOST', 'localhost'),
+    port=int(os.getenv('REDIS_PORT', 6379)),
+    db=0,
+    max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+    timeout=float(os.getenv('REDIS_POOL_TIMEOUT', 5)),
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    retry=AsyncRetry(NoBackoff(), 0)
+)
+async_redis_client = AsyncRedis(connection_pool=async_redis_pool)
+
+# Values are stored as codec-encoded bytes; see cache_codec
+codec = CacheCodec(
+    serializer=os.getenv('CACHE_SERIALIZER'),
+    compressor=os.getenv('CACHE_COMPRESSOR'),
+    compress_min_bytes=int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))
+)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+TAG_VERSION_PREFIX = "cache:tag:"
+# Namespaced keys look like "<namespace>:v<version>:<key>"; bumping the
+# version orphans every entry of the namespace at once and the old ones
+# age out by TTL (or are removed by purge_namespace)
+NAMESPACE_VERSION_PREFIX = "cache:ns:"
+NAMESPACE_REGISTRY = "cache:namespaces"
+# Identifies this worker's own invalidation messages
+WORKER_ID = uuid.uuid4().hex
+
+_MISSING = object()
+
+class LocalCache:
+    # In-process L1: LRU bounded by the encoded size of its values, with a
+    # per-entry TTL so entries never outlive the Redis copy for long.
+    # Values are shared between callers and must not be mutated.
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_ttl: float,
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None):
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        with self._lock:
+            self._remove(key)
+            if ttl <= 0 or size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self.evictions += 1
+                if self.on_evict is not None:
+                    self.on_evict(evicted)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions
+            }
+
+cache_metrics = CacheMetrics()
+
+local_cache = LocalCache(
+    max_bytes=int(os.getenv('CACHE_L1_MAX_BYTES', 64 * 1024 * 1024)),
+    max_ttl=float(os.getenv('CACHE_L1_TTL', 60)),
+    on_evict=cache_metrics.record_eviction
+)
+
+# Takes the writes (and serves the reads) that can't reach Redis while the
+# breaker is open; cleared when Redis comes back
+fallback_cache = LocalCache(
+    max_bytes=int(os.getenv('CACHE_FALLBACK_MAX_BYTES', 32 * 1024 * 1024)),
+    max_ttl=float(os.getenv('CACHE_FALLBACK_TTL', 300))
 )
 
+cache_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('CACHE_BREAKER_FAILURES', 5)),
+    reset_timeout=float(os.getenv('CACHE_BREAKER_RESET', 30))
+)
+
+class CacheUnavailable(Exception):
+    pass
+
+_REDIS_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError)
+
+# Keys to delete and version counters (tags, namespaces) to bump whose
+# invalidation didn't reach Redis; replayed on recovery
+_pending_deletes: set = set()
+_pending_counters: set = set()
+_pending_lock = threading.Lock()
+
+# Statistics are computed on the read replica, which may not have applied a
+# write yet when its tag is bumped. A result computed under a version that
+# this worker first saw less than REPLICA_LAG seconds ago is only cached
+# briefly, and no ETag is derived from such a version.
+REPLICA_LAG = settings.DB_REPLICA_PIN_SECONDS if settings.SQLALCHEMY_REPLICA_URL else 0.0
+_version_seen: Dict[str, Tuple[int, float]] = {}
+_version_seen_lock = threading.Lock()
+
+def _versions_settled(versions: Dict[str, int]) -> bool:
+    if REPLICA_LAG <= 0 or not versions:
+        return True
+    now = time.monotonic()
+    settled = True
+    with _version_seen_lock:
+        if len(_version_seen) > 10000:
+            # Forgetting is safe: versions just look new for REPLICA_LAG
+            _version_seen.clear()
+        for key, version in versions.items():
+            seen = _version_seen.get(key)
+            if seen is None or seen[0] != version:
+                seen = _version_seen[key] = (version, now)
+            settled = settled and now - seen[1] >= REPLICA_LAG
+    return settled
+
+def _guarded(call: Callable[[], Any]) -> Any:
+    if not cache_breaker.allow():
+        raise CacheUnavailable("Redis circuit is open")
+    try:
+        result = call()
+    except _REDIS_ERRORS as e:
+        cache_breaker.record_failure()
+        raise CacheUnavailable(str(e)) from e
+    except BaseException:
+        # Redis replied with an error or the caller was cancelled; either way
+        # don't leave a half-open probe claimed forever
+        cache_breaker.release()
+        raise
+    _record_success()
+    return result
+
+async def _guarded_async(call: Callable[[], Awaitable[Any]]) -> Any:
+    if not cache_breaker.allow():
+        raise CacheUnavailable("Redis circuit is open")
+    try:
+        result = await call()
+    except _REDIS_ERRORS as e:
+        cache_breaker.record_failure()
+        raise CacheUnavailable(str(e)) from e
+    except BaseException:
+        # Redis replied with an error or the caller was cancelled; either way
+        # don't leave a half-open probe claimed forever
+        cache_breaker.release()
+        raise
+    _record_success()
+    return result
+
+def _record_success():
+    if cache_breaker.record_success():
+        logger.info("Redis is reachable again; closing the cache circuit")
+        # Local entries written during the outage may disagree with Redis
+        fallback_cache.clear()
+        local_cache.clear()
+        threading.Thread(target=_replay_invalidations, name="cache-replay", daemon=True).start()
+
+def _defer_invalidation(keys: Iterable[str] = (), counters: Iterable[str] = ()):
+    counters = list(counters)
+    with _pending_lock:
+        _pending_deletes.update(keys)
+        _pending_counters.update(counters)
+    if counters:
+        # Versions can't be bumped, so drop everything cached locally
+        local_cache.clear()
+        fallback_cache.clear()
+
+def _replay_invalidations():
+    with _pending_lock:
+        keys, counters = list(_pending_deletes), list(_pending_counters)
+        _pending_deletes.clear()
+        _pending_counters.clear()
+    if not keys and not counters:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    if keys:
+        pipe.delete(*keys)
+    for counter in counters:
+        pipe.incr(counter)
+    # Namespace versions are cached in other workers' L1 too
+    pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(keys + counters))
+    try:
+        _guarded(pipe.execute)
+    except CacheUnavailable:
+        _defer_invalidation(keys, counters)
+
+def _hit_ratio(hits: int, misses: int) -> float:
+    return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+# Deletes the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 class CacheService:
+    # Synchronous client for sync routes and threads; async code uses AsyncCacheService
+    l2_hits = 0
+    l2_misses = 0
+    _listener: Optional[threading.Thread] = None
+    _listener_lock = threading.Lock()
+
     @staticmethod
     def get(key: str) -> Optional[Any]:
-        data = redis_client.get(key)
-        return json.loads(data) if data else None
+        CacheService._ensure_listener()
+        started = time.perf_counter()
+        value = local_cache.get(key)
+        if value is not _MISSING:
+            cache_metrics.record_get(key, True, time.perf_counter() - started, local=True)
+            return value
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        try:
+            data, pttl = _guarded(pipe.execute)
+        except CacheUnavailable:
+            value = fallback_cache.get(key)
+            value = None if value is _MISSING else value
+            cache_metrics.record_get(key, value is not None, time.perf_counter() - started, local=True)
+            return value
+        value = _load(key, data, pttl)
+        cache_metrics.record_get(key, value is not None, time.perf_counter() - started)
+        return value
 
     @staticmethod
     def set(key: str, value: Any, expire: int = 3600) -> None:
-        redis_client.setex(key, expire, json.dumps(value))
+        CacheService._ensure_listener()
+        started = time.perf_counter()
+        data = codec.encode(value)
+        local_cache.set(key, value, len(data), expire)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.setex(key, expire, data)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message([key]))
+        try:
+            _guarded(pipe.execute)
+        except CacheUnavailable:
+            fallback_cache.set(key, value, len(data), expire)
+        cache_metrics.record_set(key, len(data), time.perf_counter() - started)
 
     @staticmethod
     def delete(key: str) -> None:
-        redis_client.delete(key)
\ No newline at end of file
+        local_cache.discard(key)
+        fallback_cache.discard(key)
+        cache_metrics.record_delete(key)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(key)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message([key]))
+        try:
+            _guarded(pipe.execute)
+        except CacheUnavailable:
+            _defer_invalidation(keys=[key])
+
+    @staticmethod
+    def is_available() -> bool:
+        return cache_breaker.state == CircuitBreaker.CLOSED
+
+    @staticmethod
+    def prefix_stats(top: int = 20) -> Dict[str, Any]:
+        """Per key-prefix counters and latencies, plus the `top` largest
+        values written, as seen by this worker."""
+        return {
+            "worker": WORKER_ID,
+            "prefixes": cache_metrics.snapshot(),
+            "largest": cache_metrics.largest(top)
+        }
+
+    @staticmethod
+    def health() -> Dict[str, Any]:
+        with _pending_lock:
+            pending = len(_pending_deletes) + len(_pending_counters)
+        return {
+            "available": CacheService.is_available(),
+            "breaker": cache_breaker.stats(),
+            "fallback": fallback_cache.stats(),
+            "pending_invalidations": pending
+        }
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {
+            "l1": {
+                "hits": local_cache.hits,
+                "misses": local_cache.misses,
+                "hit_ratio": _hit_ratio(local_cache.hits, local_cache.misses),
+                **local_cache.stats()
+            },
+            "l2": {
+                "hits": CacheService.l2_hits,
+                "misses": CacheService.l2_misses,
+                "hit_ratio": _hit_ratio(CacheService.l2_hits, CacheService.l2_misses)
+            },
+            "codec": codec.stats(),
+            "health": CacheService.health()
+        }
+
+    @staticmethod
+    def invalidate_tags(*tags: str) -> None:
+        """Bump the version of each tag; cached entries that recorded an
+        older version are treated as misses. Called after writes commit."""
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        version_keys = _drop_tag_versions(tags)
+        pipe = redis_client.pipeline(transaction=False)
+        for version_key in version_keys:
+            pipe.incr(version_key)
+        # Tag versions are cached in other workers' L1 too
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(version_keys))
+        try:
+            _guarded(pipe.execute)
+        except CacheUnavailable as e:
+            # The write already committed; bump the versions once Redis is back
+            logger.warning("Cache tag invalidation deferred for %s: %s", tags, e)
+            _defer_invalidation(counters=version_keys)
+
+    @staticmethod
+    def _ensure_listener():
+        if CacheService._listener is not None:
+            return
+        with CacheService._listener_lock:
+            if CacheService._listener is None:
+                CacheService._listener = threading.Thread(
+                    target=CacheService._listen_for_invalidations,
+                    name="cache-invalidation",
+                    daemon=True
+                )
+                CacheService._listener.start()
+
+    @staticmethod
+    def _listen_for_invalidations():
+        while True:
+            try:
+                pubsub = pubsub_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages may have been missed while disconnected
+                local_cache.clear()
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == WORKER_ID:
+                        continue
+                    for key in payload.get("keys", []):
+                        local_cache.discard(key)
+            except Exception:
+                time.sleep(1)
+
+def _drop_tag_versions(tags: List[str]) -> List[str]:
+    # Our own invalidation messages are ignored, so forget our L1 copies here
+    version_keys = [TAG_VERSION_PREFIX + tag for tag in tags]
+    for version_key in version_keys:
+        local_cache.discard(version_key)
+    return version_keys
+
+def _invalidation_message(keys: List[str]) -> str:
+    # Other workers drop their L1 copy; our own message is ignored
+    return json.dumps({"origin": WORKER_ID, "keys": keys})
+
+def _load(key: str, data: Optional[bytes], pttl: Optional[int]) -> Optional[Any]:
+    # Decodes an L2 read and keeps it in L1 for at most its remaining TTL
+    if not data:
+        CacheService.l2_misses += 1
+        return None
+    CacheService.l2_hits += 1
+    value = codec.decode(data)
+    local_cache.set(key, value, len(data), pttl / 1000 if pttl and pttl > 0 else None)
+    return value
+
+class AsyncCacheService:
+    # Same storage and L1 as CacheService over the pooled asyncio client
+    _inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    async def get(key: str) -> Optional[Any]:
+        return (await AsyncCacheService.mget([key]))[key]
+
+    @staticmethod
+    async def mget(keys: List[str]) -> Dict[str, Optional[Any]]:
+        """Read several keys; L1 misses are fetched in one pipelined round trip."""
+        CacheService._ensure_listener()
+        started = time.perf_counter()
+        values: Dict[str, Optional[Any]] = {}
+        remote = []
+        for key in keys:
+            value = local_cache.get(key)
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                values[key] = value
+                cache_metrics.record_get(key, True, time.perf_counter() - started, local=True)
+        if remote:
+            pipe = async_redis_client.pipeline(transaction=False)
+            for key in remote:
+                pipe.get(key)
+                pipe.pttl(key)
+            try:
+                replies = await _guarded_async(pipe.execute)
+            except CacheUnavailable:
+                for key in remote:
+                    value = fallback_cache.get(key)
+                    values[key] = None if value is _MISSING else value
+                    cache_metrics.record_get(key, value is not _MISSING, time.perf_counter() - started, local=True)
+                return values
+            # Every key of the batch is charged the round trip
+            elapsed = time.perf_counter() - started
+            for index, key in enumerate(remote):
+                values[key] = _load(key, replies[2 * index], replies[2 * index + 1])
+                cache_metrics.record_get(key, values[key] is not None, elapsed)
+        return values
+
+    @staticmethod
+    async def set(key: str, value: Any, expire: int = 3600) -> None:
+        await AsyncCacheService.mset({key: value}, expire)
+
+    @staticmethod
+    async def mset(items: Dict[str, Any], expire: int = 3600) -> None:
+        """Write several keys with the same TTL in one pipelined round trip."""
+        if not items:
+            return
+        CacheService._ensure_listener()
+        started = time.perf_counter()
+        pipe = async_redis_client.pipeline(transaction=False)
+        encoded = {}
+        for key, value in items.items():
+            data = codec.encode(value)
+            encoded[key] = len(data)
+            pipe.setex(key, expire, data)
+            local_cache.set(key, value, len(data), expire)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(list(items)))
+        try:
+            await _guarded_async(pipe.execute)
+        except CacheUnavailable:
+            for key, value in items.items():
+                fallback_cache.set(key, value, encoded[key], expire)
+        elapsed = time.perf_counter() - started
+        for key, size in encoded.items():
+            cache_metrics.record_set(key, size, elapsed)
+
+    @staticmethod
+    async def delete(*keys: str) -> None:
+        if not keys:
+            return
+        for key in keys:
+            local_cache.discard(key)
+            fallback_cache.discard(key)
+            cache_metrics.record_delete(key)
+        pipe = async_redis_client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(list(keys)))
+        try:
+            await _guarded_async(pipe.execute)
+        except CacheUnavailable:
+            _defer_invalidation(keys=keys)
+
+    @staticmethod
+    def pipeline(transaction: bool = False):
+        """Raw pipeline on the pooled client for batched commands that don't
+        go through the codec (counters, hashes); run it with execute()."""
+        return async_redis_client.pipeline(transaction=transaction)
+
+    @staticmethod
+    async def execute(pipe) -> List[Any]:
+        """Execute a pipeline() through the circuit breaker; raises
+        CacheUnavailable instead of waiting on a Redis that is down."""
+        return await _guarded_async(pipe.execute)
+
+    @staticmethod
+    async def invalidate_tags(*tags: str) -> None:
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        version_keys = _drop_tag_versions(tags)
+        pipe = async_redis_client.pipeline(transaction=False)
+        for version_key in version_keys:
+            pipe.incr(version_key)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(version_keys))
+        try:
+            await _guarded_async(pipe.execute)
+        except CacheUnavailable as e:
+            logger.warning("Cache tag invalidation deferred for %s: %s", tags, e)
+            _defer_invalidation(counters=version_keys)
+
+    @staticmethod
+    async def namespace_version(namespace: str) -> int:
+        version_key = NAMESPACE_VERSION_PREFIX + namespace
+        version = local_cache.get(version_key)
+        if version is not _MISSING:
+            return version
+        pipe = async_redis_client.pipeline(transaction=False)
+        pipe.sadd(NAMESPACE_REGISTRY, namespace)
+        pipe.get(version_key)
+        try:
+            _, value = await _guarded_async(pipe.execute)
+        except CacheUnavailable:
+            # Entries land in the fallback cache, which is cleared on recovery
+            return 0
+        version = int(value or 0)
+        local_cache.set(version_key, version, len(version_key))
+        return version
+
+    @staticmethod
+    async def namespaced_key(namespace: str, key: str) -> str:
+        return f"{namespace}:v{await AsyncCacheService.namespace_version(namespace)}:{key}"
+
+    @staticmethod
+    async def clear_namespace(*namespaces: str) -> None:
+        """Invalidate every entry of each namespace with one INCR apiece."""
+        if not namespaces:
+            return
+        version_keys = [NAMESPACE_VERSION_PREFIX + namespace for namespace in namespaces]
+        for version_key in version_keys:
+            local_cache.discard(version_key)
+        pipe = async_redis_client.pipeline(transaction=False)
+        for version_key in version_keys:
+            pipe.incr(version_key)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(version_keys))
+        try:
+            await _guarded_async(pipe.execute)
+        except CacheUnavailable as e:
+            logger.warning("Cache namespace clear deferred for %s: %s", namespaces, e)
+            _defer_invalidation(counters=version_keys)
+
+    @staticmethod
+    async def clear_all() -> List[str]:
+        """Clear every namespace that has been used; returns their names."""
+        members = await _guarded_async(lambda: async_redis_client.smembers(NAMESPACE_REGISTRY))
+        namespaces = sorted(
+            member.decode() if isinstance(member, bytes) else member for member in members
+        )
+        await AsyncCacheService.clear_namespace(*namespaces)
+        return namespaces
+
+    @staticmethod
+    async def purge_namespace(namespace: str, batch_size: int = 500) -> int:
+        """Delete the entries of older namespace versions. Walks the keyspace
+        with SCAN and removes them with UNLINK a batch at a time, so Redis
+        keeps serving other clients; returns the number of keys removed."""
+        if not CacheService.is_available():
+            raise CacheUnavailable("Redis circuit is open")
+        current = f"{namespace}:v{await AsyncCacheService.namespace_version(namespace)}:"
+        deleted = 0
+        batch: List[bytes] = []
+        try:
+            async for key in async_redis_client.scan_iter(match=f"{namespace}:v*", count=batch_size):
+                name = key.decode() if isinstance(key, bytes) else key
+                if not name.startswith(current):
+                    batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await async_redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await async_redis_client.unlink(*batch)
+        except _REDIS_ERRORS as e:
+            raise CacheUnavailable(str(e)) from e
+        return deleted
+
+    @staticmethod
+    async def data_versions(tags: Iterable[str], namespace: Optional[str] = None) -> Dict[str, int]:
+        """Current version of each tag (and of the namespace), for callers
+        that derive validators such as ETags from them."""
+        versions = await AsyncCacheService._tag_versions(tags)
+        if namespace:
+            versions[NAMESPACE_VERSION_PREFIX + namespace] = await AsyncCacheService.namespace_version(namespace)
+        return versions
+
+    @staticmethod
+    def versions_settled(versions: Dict[str, int]) -> bool:
+        """False while any of `versions` may be newer than the replica's data."""
+        return _versions_settled(versions)
+
+    @staticmethod
+    async def _tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+        # Served from L1 like namespace versions: bumps publish the version
+        # keys on the invalidation channel, so an L1 hit skips the MGET
+        tags = list(tags)
+        if not tags:
+            return {}
+        CacheService._ensure_listener()
+        versions: Dict[str, int] = {}
+        missing = []
+        for tag in tags:
+            version = local_cache.get(TAG_VERSION_PREFIX + tag)
+            if version is _MISSING:
+                missing.append(tag)
+            else:
+                versions[tag] = version
+        if missing:
+            version_keys = [TAG_VERSION_PREFIX + tag for tag in missing]
+            values = await _guarded_async(lambda: async_redis_client.mget(version_keys))
+            for tag, version_key, value in zip(missing, version_keys, values):
+                versions[tag] = int(value or 0)
+                local_cache.set(version_key, versions[tag], len(version_key))
+        return {tag: versions[tag] for tag in tags}
+
+    @staticmethod
+    async def get_or_compute(
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = 3600,
+        stale_ttl: int = 600,
+        beta: float = 1.0,
+        lock_ttl: int = 60,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Serve `key` from cache, recomputing it at most once per expiry.
+
+        Entries carry their soft expiry and how long they took to compute.
+        Past the soft expiry (or earlier, with XFetch probability growing as
+        expiry approaches) one caller recomputes while the others keep getting
+        the stale value for up to `stale_ttl` seconds. Concurrent misses wait
+        on the in-process future or on the worker holding the Redis lock.
+        Entries computed before one of their `tags` was invalidated are misses.
+        """
+        entry = await AsyncCacheService._read_entry(key)
+        if entry is not None and not AsyncCacheService._should_refresh(entry, beta):
+            return entry["value"]
+
+        inflight = AsyncCacheService._inflight.get(key)
+        if inflight is not None:
+            if entry is not None:
+                return entry["value"]
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        AsyncCacheService._inflight[key] = future
+        try:
+            value = await AsyncCacheService._refresh(key, entry, compute, ttl, stale_ttl, lock_ttl, tags or [])
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; mark it retrieved
+            raise
+        finally:
+            AsyncCacheService._inflight.pop(key, None)
+
+    @staticmethod
+    async def _refresh(
+        key: str,
+        entry: Optional[Dict[str, Any]],
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        lock_ttl: int,
+        tags: List[str]
+    ) -> Any:
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await _guarded_async(
+                lambda: async_redis_client.set(lock_key, token, nx=True, ex=lock_ttl)
+            )
+        except CacheUnavailable:
+            # Without Redis only the in-process single flight applies
+            acquired, token = True, None
+        if not acquired:
+            # Another worker is recomputing
+            if entry is not None:
+                return entry["value"]
+            entry = await AsyncCacheService._wait_for_entry(key, lock_key, lock_ttl)
+            if entry is not None:
+                return entry["value"]
+            token = None
+
+        try:
+            # Versions are read before computing so a write during the
+            # computation still invalidates its result
+            try:
+                versions = await AsyncCacheService._tag_versions(tags)
+            except CacheUnavailable:
+                # The entry lands in the fallback cache, which tag bumps clear
+                versions = {}
+            if not _versions_settled(versions):
+                # The replica may still be missing the write behind a version
+                ttl, stale_ttl = max(1, math.ceil(REPLICA_LAG)), 0
+            started = time.perf_counter()
+            value = await compute()
+            await AsyncCacheService._write_entry(key, value, time.perf_counter() - started, ttl, stale_ttl, versions)
+            return value
+        finally:
+            if token is not None:
+                try:
+                    await _guarded_async(lambda: async_redis_client.eval(_RELEASE_LOCK, 1, lock_key, token))
+                except CacheUnavailable:
+                    pass  # the lock expires after lock_ttl
+
+    @staticmethod
+    async def _wait_for_entry(key: str, lock_key: str, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await AsyncCacheService._read_entry(key)
+            if entry is not None:
+                return entry
+            try:
+                if not await _guarded_async(lambda: async_redis_client.exists(lock_key)):
+                    break
+            except CacheUnavailable:
+                break
+        return None
+
+    @staticmethod
+    def _should_refresh(entry: Dict[str, Any], beta: float) -> bool:
+        # XFetch: now - delta * beta * ln(rand) >= expiry
+        jitter = entry["delta"] * beta * math.log(random.random() or 1e-12)
+        return time.time() - jitter >= entry["expires_at"]
+
+    @staticmethod
+    async def _read_entry(key: str) -> Optional[Dict[str, Any]]:
+        entry = await AsyncCacheService.get(key)
+        # Plain values written by CacheService.set are treated as misses
+        if not isinstance(entry, dict) or entry.get("__cached__") != 1:
+            return None
+        versions = entry.get("tags")
+        if versions:
+            try:
+                if await AsyncCacheService._tag_versions(versions) != versions:
+                    return None
+            except CacheUnavailable:
+                pass  # local copies are dropped whenever a tag can't be bumped
+        return entry
+
+    @staticmethod
+    async def _write_entry(
+        key: str,
+        value: Any,
+        delta: float,
+        ttl: int,
+        stale_ttl: int,
+        versions: Dict[str, int]
+    ) -> None:
+        entry = {
+            "__cached__": 1,
+            "value": value,
+            "delta": delta,
+            "expires_at": time.time() + ttl,
+            "tags": versions
+        }
+        # Kept past the soft expiry so stale values can be served while refreshing
+        await AsyncCacheService.set(key, entry, ttl + stale_ttl)
+
+def cached(
+    key: str,
+    ttl: int = 3600,
+    stale_ttl: int = 600,
+    beta: float = 1.0,
+    tags: Optional[List[str]] = None,
+    namespace: Optional[str] = None
+):
+    """Cache an async endpoint's result under `key`, a format string over its
+    arguments (e.g. "client_insights_{client_id}"); `tags` are formatted the
+    same way (e.g. ["client:{client_id}"]). With a `namespace` the key is
+    versioned so clear_namespace drops all of them. See get_or_compute."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            cache_key = key.format(**arguments)
+            if namespace:
+                cache_key = await AsyncCacheService.namespaced_key(namespace, cache_key)
+            return await AsyncCacheService.get_or_compute(
+                cache_key,
+                lambda: fn(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                beta=beta,
+                tags=[tag.format(**arguments) for tag in tags or []]
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import json
+import threading
+import time
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Encoded entries start with one header byte: the high bit marks the format
+# (json.dumps output is ASCII, so legacy entries never have it set), bits 3-6
+# identify the compressor and bits 0-2 the serializer.
+HEADER_FLAG = 0x80
+
+class Serializer(NamedTuple):
+    id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+class Compressor(NamedTuple):
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+SERIALIZERS: Dict[str, Serializer] = {
+    "json": Serializer(1, "json", lambda value: json.dumps(value).encode(), json.loads)
+}
+if orjson is not None:
+    # Non-string keys are stringified like json.dumps does
+    SERIALIZERS["orjson"] = Serializer(
+        2, "orjson",
+        lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads
+    )
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = Serializer(
+        3, "msgpack",
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False)
+    )
+
+COMPRESSORS: Dict[str, Compressor] = {
+    "zlib": Compressor(1, "zlib", lambda data: zlib.compress(data, 6), zlib.decompress)
+}
+if zstandard is not None:
+    # zstandard contexts must not be shared between threads
+    _zstd = threading.local()
+
+    def _zstd_compress(data: bytes) -> bytes:
+        if not hasattr(_zstd, "compressor"):
+            _zstd.compressor = zstandard.ZstdCompressor(level=3)
+        return _zstd.compressor.compress(data)
+
+    def _zstd_decompress(data: bytes) -> bytes:
+        if not hasattr(_zstd, "decompressor"):
+            _zstd.decompressor = zstandard.ZstdDecompressor()
+        return _zstd.decompressor.decompress(data)
+
+    COMPRESSORS["zstd"] = Compressor(2, "zstd", _zstd_compress, _zstd_decompress)
+if lz4 is not None:
+    COMPRESSORS["lz4"] = Compressor(3, "lz4", lz4.frame.compress, lz4.frame.decompress)
+
+_SERIALIZERS_BY_ID = {serializer.id: serializer for serializer in SERIALIZERS.values()}
+_COMPRESSORS_BY_ID = {compressor.id: compressor for compressor in COMPRESSORS.values()}
+
+def _default_serializer() -> str:
+    return next(name for name in ("orjson", "msgpack", "json") if name in SERIALIZERS)
+
+def _default_compressor() -> str:
+    return next(name for name in ("zstd", "lz4", "zlib") if name in COMPRESSORS)
+
+class CacheCodec:
+    """Encodes cache values with the configured serializer, compressing them
+    above `compress_min_bytes`. Any registered format can be decoded, so the
+    configuration can change without flushing Redis."""
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compressor: Optional[str] = None,
+        compress_min_bytes: int = 1024
+    ):
+        serializer = serializer or _default_serializer()
+        compressor = compressor or _default_compressor()
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Cache serializer '{serializer}' is not available")
+        if compressor != "none" and compressor not in COMPRESSORS:
+            raise ValueError(f"Cache compressor '{compressor}' is not available")
+        self.serializer = SERIALIZERS[serializer]
+        self.compressor = COMPRESSORS.get(compressor)
+        self.compress_min_bytes = compress_min_bytes
+
+        self.encoded = 0
+        self.decoded = 0
+        self.legacy_decoded = 0
+        self.compressed = 0
+        self.serialized_bytes = 0
+        self.stored_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def encode(self, value: Any) -> bytes:
+        started = time.perf_counter()
+        payload = self.serializer.dumps(value)
+        self.serialized_bytes += len(payload)
+        compressor_id = 0
+        if self.compressor is not None and len(payload) >= self.compress_min_bytes:
+            compressed = self.compressor.compress(payload)
+            # Incompressible payloads are stored as is
+            if len(compressed) < len(payload):
+                compressor_id = self.compressor.id
+                payload = compressed
+                self.compressed += 1
+        data = bytes((HEADER_FLAG | compressor_id << 3 | self.serializer.id,)) + payload
+
+        self.encoded += 1
+        self.stored_bytes += len(data)
+        self.encode_seconds += time.perf_counter() - started
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        started = time.perf_counter()
+        header = data[0] if data else 0
+        if not header & HEADER_FLAG:
+            # Written as plain json.dumps text before the codec existed
+            value = json.loads(data)
+            self.legacy_decoded += 1
+        else:
+            serializer = _SERIALIZERS_BY_ID.get(header & 0x07)
+            compressor_id = header >> 3 & 0x0F
+            compressor = _COMPRESSORS_BY_ID.get(compressor_id)
+            if serializer is None or (compressor_id and compressor is None):
+                raise ValueError(f"Unsupported cache entry header 0x{header:02x}")
+            payload = data[1:]
+            if compressor is not None:
+                payload = compressor.decompress(payload)
+            value = serializer.loads(payload)
+
+        self.decoded += 1
+        self.decode_seconds += time.perf_counter() - started
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer.name,
+            "compressor": self.compressor.name if self.compressor else None,
+            "compress_min_bytes": self.compress_min_bytes,
+            "encoded": self.encoded,
+            "compressed": self.compressed,
+            "decoded": self.decoded,
+            "legacy_decoded": self.legacy_decoded,
+            "serialized_bytes": self.serialized_bytes,
+            "stored_bytes": self.stored_bytes,
+            "bytes_saved": self.serialized_bytes - self.stored_bytes,
+            "avg_encode_ms": round(self.encode_seconds * 1000 / self.encoded, 4) if self.encoded else 0.0,
+            "avg_decode_ms": round(self.decode_seconds * 1000 / self.decoded, 4) if self.decoded else 0.0
+        }
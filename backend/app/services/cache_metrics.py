@@ -0,0 +1,98 @@
+from typing import Any, Dict, List
+import heapq
+import re
+import threading
+from ..utils.histogram import LatencyHistogram
+
+# Per-process cache counters grouped by key prefix: digits are folded into
+# "*" so "stats:v3:client_insights_42" and "stats:v4:client_insights_7" both
+# count under "stats:v*:client_insights_*".
+
+_DIGITS = re.compile(r"\d+")
+
+def key_prefix(key: str) -> str:
+    return _DIGITS.sub("*", key)
+
+class PrefixMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.bytes_written = 0
+        self.get_latency = LatencyHistogram()
+        self.set_latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "local_hits": self.local_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": self.bytes_written // self.sets if self.sets else 0,
+            "get_latency": self.get_latency.summary(),
+            "set_latency": self.set_latency.summary()
+        }
+
+class CacheMetrics:
+    def __init__(self, max_prefixes: int = 200, track_largest: int = 100):
+        self.max_prefixes = max_prefixes
+        self.track_largest = track_largest
+        self._prefixes: Dict[str, PrefixMetrics] = {}
+        # Largest values seen by key, bounded to `track_largest` entries
+        self._largest: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _metrics(self, key: str) -> PrefixMetrics:
+        prefix = key_prefix(key)
+        metrics = self._prefixes.get(prefix)
+        if metrics is None:
+            if len(self._prefixes) >= self.max_prefixes:
+                prefix = "other"
+                metrics = self._prefixes.get(prefix)
+            if metrics is None:
+                metrics = self._prefixes[prefix] = PrefixMetrics()
+        return metrics
+
+    def record_get(self, key: str, hit: bool, seconds: float, local: bool = False):
+        with self._lock:
+            metrics = self._metrics(key)
+            if hit:
+                metrics.hits += 1
+                metrics.local_hits += local
+            else:
+                metrics.misses += 1
+            metrics.get_latency.record(seconds)
+
+    def record_set(self, key: str, size: int, seconds: float):
+        with self._lock:
+            metrics = self._metrics(key)
+            metrics.sets += 1
+            metrics.bytes_written += size
+            metrics.set_latency.record(seconds)
+
+            self._largest[key] = size
+            if len(self._largest) > self.track_largest:
+                del self._largest[min(self._largest, key=self._largest.get)]
+
+    def record_eviction(self, key: str):
+        with self._lock:
+            self._metrics(key).evictions += 1
+
+    def record_delete(self, key: str):
+        with self._lock:
+            self._largest.pop(key, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {prefix: metrics.snapshot() for prefix, metrics in sorted(self._prefixes.items())}
+
+    def largest(self, n: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            top = heapq.nlargest(n, self._largest.items(), key=lambda item: item[1])
+        return [{"key": key, "prefix": key_prefix(key), "bytes": size} for key, size in top]
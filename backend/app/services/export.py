@@ -1,18 +1,18 @@
 from fastapi import HTTPException, status
 import pandas as pd
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import io
-from typing import List, Dict, Any
+from typing import Dict, Any
 import csv
 
 class ExportService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def export_to_csv(self, query: str, params: Dict[str, Any] = None) -> bytes:
+    async def export_to_csv(self, query: str, params: Dict[str, Any] = None) -> bytes:
         try:
-            results = self.db.execute(text(query), params or {}).fetchall()
+            results = (await self.db.execute(text(query), params or {})).fetchall()
             if not results:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -36,9 +36,12 @@ class ExportService:
                 detail=f"Error exporting data: {str(e)}"
             )
 
-    def export_to_excel(self, query: str, params: Dict[str, Any] = None) -> bytes:
+    async def export_to_excel(self, query: str, params: Dict[str, Any] = None) -> bytes:
         try:
-            df = pd.read_sql(query, self.db.connection(), params=params or {})
+            # pandas needs a sync connection, run it on the session's greenlet bridge
+            df = await self.db.run_sync(
+                lambda session: pd.read_sql(text(query), session.connection(), params=params or {})
+            )
             if df.empty:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,41 @@
+import httpx
+from importlib.util import find_spec
+from typing import Optional
+from ..config import settings
+
+# One AsyncClient per process so MeLi calls reuse keep-alive (and, when the
+# h2 package is installed, HTTP/2) connections instead of opening a new
+# TCP/TLS connection per request. Opened on app startup, closed on shutdown.
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=settings.MELI_API_BASE_URL,
+        http2=settings.MELI_HTTP2 and find_spec("h2") is not None,
+        timeout=httpx.Timeout(
+            settings.MELI_HTTP_READ_TIMEOUT,
+            connect=settings.MELI_HTTP_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.MELI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MELI_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=30.0
+        )
+    )
+
+def get_meli_client() -> httpx.AsyncClient:
+    # Scripts that never run the app's startup hooks get a client on first use
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+async def start_meli_client():
+    get_meli_client()
+
+async def close_meli_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,61 +1,132 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List
-from ..services.cache import CacheService
+from typing import Dict, List, Optional
+from ..services.cache import AsyncCacheService, CacheUnavailable
+from ..utils.histogram import LatencyHistogram, bucket_index
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Counters live in one Redis hash per time bucket and are only ever
+# incremented, so concurrent workers never overwrite each other. Every call
+# updates its minute and hour buckets in a single pipelined round trip.
+# Latencies are counted in log-scale histogram buckets (latency:<bucket> and
+# latency:<bucket>:<endpoint>), which add up across buckets into percentiles.
+RESOLUTIONS = {
+    "minute": (timedelta(minutes=1), "%Y%m%d%H%M", timedelta(days=2)),
+    "hour": (timedelta(hours=1), "%Y%m%d%H", timedelta(days=35))
+}
+
 class MeliMonitor:
     def __init__(self):
-        self.cache = CacheService
+        self.cache = AsyncCacheService
+
+    @staticmethod
+    def _bucket_key(resolution: str, moment: datetime) -> str:
+        return f"meli_metrics:{resolution}:{moment.strftime(RESOLUTIONS[resolution][1])}"
 
     async def log_api_call(self, endpoint: str, success: bool, response_time: float):
-        key = f"meli_metrics_{datetime.now().strftime('%Y%m%d_%H')}"
-        metrics = self.cache.get(key) or {
-            "calls": 0,
-            "failures": 0,
-            "total_response_time": 0,
-            "endpoints": {}
-        }
-        
-        metrics["calls"] += 1
-        if not success:
-            metrics["failures"] += 1
-        metrics["total_response_time"] += response_time
-        
-        if endpoint not in metrics["endpoints"]:
-            metrics["endpoints"][endpoint] = {"calls": 0, "failures": 0}
-        
-        metrics["endpoints"][endpoint]["calls"] += 1
-        if not success:
-            metrics["endpoints"][endpoint]["failures"] += 1
-        
-        self.cache.set(key, metrics, 86400)  # Store for 24 hours
+        now = datetime.now()
+        latency_bucket = bucket_index(response_time)
+        pipe = self.cache.pipeline()
+        for resolution, (_, _, retention) in RESOLUTIONS.items():
+            key = self._bucket_key(resolution, now)
+            pipe.hincrby(key, "calls", 1)
+            pipe.hincrby(key, f"calls:{endpoint}", 1)
+            if not success:
+                pipe.hincrby(key, "failures", 1)
+                pipe.hincrby(key, f"failures:{endpoint}", 1)
+            pipe.hincrbyfloat(key, "response_time", response_time)
+            pipe.hincrby(key, f"latency:{latency_bucket}", 1)
+            pipe.hincrby(key, f"latency:{latency_bucket}:{endpoint}", 1)
+            pipe.expire(key, int(retention.total_seconds()))
+        try:
+            await self.cache.execute(pipe)
+        except CacheUnavailable as e:
+            # Metrics are best effort while Redis is down
+            logger.debug(f"Dropped MeLi metrics for {endpoint}: {str(e)}")
+
+    async def get_metrics(
+        self,
+        start: datetime,
+        end: Optional[datetime] = None,
+        resolution: str = "hour"
+    ) -> Dict:
+        """Totals, error rates and latency percentiles, overall and per
+        endpoint, plus a per-bucket series for [start, end]."""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unsupported resolution '{resolution}'")
+        step, bucket_format, retention = RESOLUTIONS[resolution]
+        end = end or datetime.now()
+        # Older buckets have expired; don't ask for them
+        start = max(start, end - retention)
+
+        buckets: List[datetime] = []
+        moment = datetime.strptime(start.strftime(bucket_format), bucket_format)
+        while moment <= end:
+            buckets.append(moment)
+            moment += step
+
+        pipe = self.cache.pipeline()
+        for moment in buckets:
+            pipe.hgetall(self._bucket_key(resolution, moment))
+        hashes = await self.cache.execute(pipe) if buckets else []
 
-    async def get_daily_metrics(self) -> Dict:
-        today = datetime.now().strftime('%Y%m%d')
         metrics = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "resolution": resolution,
             "total_calls": 0,
             "total_failures": 0,
             "avg_response_time": 0,
-            "endpoints": {}
+            "error_rate": 0,
+            "latency": None,
+            "endpoints": {},
+            "series": []
         }
-        
-        for hour in range(24):
-            key = f"meli_metrics_{today}_{hour:02d}"
-            hour_metrics = self.cache.get(key)
-            if hour_metrics:
-                metrics["total_calls"] += hour_metrics["calls"]
-                metrics["total_failures"] += hour_metrics["failures"]
-                metrics["avg_response_time"] += hour_metrics["total_response_time"]
-                
-                for endpoint, data in hour_metrics["endpoints"].items():
-                    if endpoint not in metrics["endpoints"]:
-                        metrics["endpoints"][endpoint] = {"calls": 0, "failures": 0}
-                    metrics["endpoints"][endpoint]["calls"] += data["calls"]
-                    metrics["endpoints"][endpoint]["failures"] += data["failures"]
-        
+        total_response_time = 0.0
+        latency = LatencyHistogram()
+        endpoint_latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        for moment, fields in zip(buckets, hashes):
+            if not fields:
+                continue
+            bucket = {"calls": 0, "failures": 0, "response_time": 0.0}
+            bucket_latency = LatencyHistogram()
+            for field, value in fields.items():
+                field = field.decode() if isinstance(field, bytes) else field
+                name, _, endpoint = field.partition(":")
+                if name == "latency":
+                    index, _, endpoint = endpoint.partition(":")
+                    histogram = endpoint_latency[endpoint] if endpoint else bucket_latency
+                    histogram.add_bucket(int(index), int(value))
+                elif endpoint:
+                    counts = metrics["endpoints"].setdefault(endpoint, {"calls": 0, "failures": 0})
+                    counts[name] += int(value)
+                elif name in bucket:
+                    bucket[name] += float(value) if name == "response_time" else int(value)
+
+            metrics["total_calls"] += bucket["calls"]
+            metrics["total_failures"] += bucket["failures"]
+            total_response_time += bucket["response_time"]
+            latency.merge(bucket_latency)
+            metrics["series"].append({
+                "bucket": moment.isoformat(),
+                "calls": bucket["calls"],
+                "failures": bucket["failures"],
+                "avg_response_time": bucket["response_time"] / bucket["calls"] if bucket["calls"] else 0,
+                "p99": bucket_latency.percentile(0.99)
+            })
+
         if metrics["total_calls"] > 0:
-            metrics["avg_response_time"] /= metrics["total_calls"]
-        
-        return metrics
\ No newline at end of file
+            metrics["avg_response_time"] = total_response_time / metrics["total_calls"]
+            metrics["error_rate"] = metrics["total_failures"] / metrics["total_calls"]
+        metrics["latency"] = latency.summary()
+        for endpoint, counts in metrics["endpoints"].items():
+            counts["error_rate"] = counts["failures"] / counts["calls"] if counts["calls"] else 0
+            counts["latency"] = endpoint_latency[endpoint].summary()
+
+        return metrics
+
+    async def get_daily_metrics(self) -> Dict:
+        now = datetime.now()
+        return await self.get_metrics(now.replace(hour=0, minute=0, second=0, microsecond=0), now)
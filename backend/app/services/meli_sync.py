@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import httpx
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import run_write
+from ..services.mercadolibre import MercadoLibreService, PRODUCT_LISTING_QUERY
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class MeliBulkSync:
+    """Pushes many listings to Mercado Libre: products are loaded with one
+    query, the token is refreshed once, and at most `concurrency` PUTs are in
+    flight on the shared pooled client. Sync log rows are written in a single
+    batch at the end instead of one commit per product. Database work runs in
+    a worker thread, as the sync session would otherwise block the loop."""
+
+    # Minimum seconds between progress callbacks
+    PROGRESS_INTERVAL = 0.5
+    RATE_LIMIT_RETRIES = 5
+
+    def __init__(
+        self,
+        db: Session,
+        concurrency: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.db = db
+        self.concurrency = max(1, concurrency or settings.MELI_SYNC_CONCURRENCY)
+        self.service = MercadoLibreService(db, client=client)
+        # time.monotonic() before which no listing is pushed (set by a 429)
+        self._resume_at = 0.0
+
+    def load_products(
+        self,
+        product_ids: Optional[Sequence[int]] = None,
+        since: Optional[datetime] = None
+    ) -> List[Any]:
+        if product_ids is None and since is None:
+            raise ValueError("Pass product_ids or a changed-since timestamp")
+
+        conditions = ["p.meli_item_id IS NOT NULL"]
+        params: Dict[str, Any] = {}
+        if product_ids is not None:
+            conditions.append("p.id IN :product_ids")
+            params["product_ids"] = list(product_ids)
+        if since is not None:
+            conditions.append("p.updated_at >= :since")
+            params["since"] = since
+
+        query = text(
+            PRODUCT_LISTING_QUERY + " WHERE " + " AND ".join(conditions) + " ORDER BY p.id"
+        )
+        if product_ids is not None:
+            query = query.bindparams(bindparam("product_ids", expanding=True))
+        return self.db.execute(query, params).fetchall()
+
+    async def run(
+        self,
+        product_ids: Optional[Sequence[int]] = None,
+        since: Optional[datetime] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        # Session work runs on a worker thread so the event loop keeps serving
+        products = await asyncio.to_thread(self.load_products, product_ids, since)
+        progress = {
+            "status": "running",
+            "total": len(products),
+            "done": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "results": []
+        }
+        if product_ids is not None:
+            found = {product.id for product in products}
+            for product_id in product_ids:
+                if product_id not in found:
+                    self._record(progress, product_id, None, {
+                        "success": False, "error": "Product not found or not listed on MeLi"
+                    })
+            progress["total"] += progress["done"]
+
+        if products:
+            await self.service._refresh_token_if_needed()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_report = 0.0
+
+        async def report(force: bool = False):
+            nonlocal last_report
+            now = time.perf_counter()
+            if on_progress and (force or now - last_report >= self.PROGRESS_INTERVAL):
+                last_report = now
+                await on_progress(progress)
+
+        async def sync_one(product):
+            async with semaphore:
+                result = await self._push(product, progress)
+            self._record(progress, product.id, product.meli_item_id, result)
+            await report()
+
+        await asyncio.gather(*(sync_one(product) for product in products))
+
+        await asyncio.to_thread(self._log_results, progress["results"])
+        progress["status"] = "completed"
+        progress["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        await report(force=True)
+        return progress
+
+    async def _push(self, product, progress: Dict[str, Any]) -> Dict[str, Any]:
+        # A 429 pauses every slot until Retry-After has passed; the listing is
+        # then retried rather than failed, up to RATE_LIMIT_RETRIES times
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                result = await self.service.push_listing(
+                    product.meli_item_id, self.service.build_listing(product)
+                )
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+            if "retry_after" not in result:
+                return result
+            progress["rate_limited"] += 1
+            self._resume_at = max(self._resume_at, time.monotonic() + result["retry_after"])
+        return result
+
+    @staticmethod
+    def _record(progress: Dict[str, Any], product_id: int, meli_item_id: Optional[str], result: Dict[str, Any]):
+        progress["done"] += 1
+        progress["succeeded" if result["success"] else "failed"] += 1
+        progress["results"].append({
+            "product_id": product_id,
+            "meli_item_id": meli_item_id,
+            "success": result["success"],
+            "error": result.get("error"),
+            "error_details": result.get("error_details")
+        })
+
+    def _log_results(self, results: List[Dict[str, Any]]):
+        rows = [
+            {
+                "product_id": item["product_id"],
+                "meli_item_id": item["meli_item_id"],
+                "success": item["success"],
+                "error_details": item["error_details"] or item["error"],
+                "created_at": datetime.utcnow()
+            }
+            for item in results if item["meli_item_id"] is not None
+        ]
+        if not rows:
+            return
+
+        def _insert(session: Session):
+            session.execute(
+                text("""
+                    INSERT INTO meli_sync_log (
+                        product_id, meli_item_id, success, error_details, created_at
+                    ) VALUES (
+                        :product_id, :meli_item_id, :success, :error_details, :created_at
+                    )
+                """),
+                rows
+            )
+
+        try:
+            run_write(self.db, _insert)
+        except Exception as e:
+            # The listings are already pushed; a logging failure shouldn't fail the run
+            logger.error(f"Failed to write MeLi sync log: {str(e)}")
@@ -1,22 +1,67 @@
-import requests
+import asyncio
+import httpx
+import json
+import logging
+import time
 from datetime import datetime, timedelta
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from ..config import settings
-from ..services.cache import CacheService
+from ..database import run_write
+from ..services.cache import AsyncCacheService
+from ..services.meli_http import get_meli_client
+from ..services.meli_monitor import MeliMonitor
+from ..utils.retry import async_retry
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_LISTING_QUERY = """
+    SELECT
+        p.id,
+        p.meli_item_id,
+        p.name,
+        p.description,
+        p.price,
+        p.current_stock,
+        p.category,
+        p.images,
+        p.attributes
+    FROM products p
+"""
 
 class MercadoLibreService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, client: Optional[httpx.AsyncClient] = None):
         self.db = db
-        self.base_url = "https://api.mercadolibre.com"
-        self._refresh_token_if_needed()
+        # The process-wide pooled client unless one is injected (e.g. tests)
+        self.client = client or get_meli_client()
+        self.monitor = MeliMonitor()
+        self.access_token = None
+
+    async def _request(self, method: str, path: str, endpoint: Optional[str] = None, **kwargs) -> httpx.Response:
+        # Every MeLi call is timed here and recorded under `endpoint`, a path
+        # template such as "/items/{id}" that keeps the metric keys bounded
+        started = time.perf_counter()
+        success = False
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            success = response.status_code < 400
+            return response
+        finally:
+            try:
+                await self.monitor.log_api_call(
+                    f"{method} {endpoint or path}", success, time.perf_counter() - started
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record MeLi call metrics: {str(e)}")
 
-    def _refresh_token_if_needed(self):
-        token_data = CacheService.get("meli_token")
+    async def _refresh_token_if_needed(self):
+        token_data = await AsyncCacheService.get("meli_token")
         
         if not token_data or datetime.now() >= datetime.fromisoformat(token_data['expires_at']):
-            response = requests.post(
-                f"{self.base_url}/oauth/token",
+            response = await self._request(
+                "POST",
+                "/oauth/token",
                 data={
                     "grant_type": "refresh_token",
                     "client_id": settings.MELI_CLIENT_ID,
@@ -27,7 +72,7 @@ class MercadoLibreService:
             
             if response.status_code == 200:
                 data = response.json()
-                CacheService.set("meli_token", {
+                await AsyncCacheService.set("meli_token", {
                     "access_token": data["access_token"],
                     "expires_at": (datetime.now() + timedelta(seconds=data["expires_in"])).isoformat()
                 })
@@ -37,75 +82,88 @@ class MercadoLibreService:
         else:
             self.access_token = token_data["access_token"]
 
-    async def _handle_rate_limit(self, response: requests.Response) -> bool:
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return max(0.0, float(response.headers.get('Retry-After', 60)))
+        except ValueError:
+            return 60.0
+
+    async def _handle_rate_limit(self, response: httpx.Response) -> bool:
         if response.status_code == 429:  # Rate limit exceeded
-            retry_after = int(response.headers.get('Retry-After', 60))
-            CacheService.set("meli_rate_limit", True, retry_after)
+            await AsyncCacheService.set("meli_rate_limit", True, max(1, int(self._retry_after(response))))
             return False
         return True
 
     @async_retry(retries=3, delay=1.0)
     async def update_product(self, product_id: int, meli_item_id: str, data: Dict[str, Any]):
         try:
-            if CacheService.get("meli_rate_limit"):
+            if await AsyncCacheService.get("meli_rate_limit"):
                 return {"success": False, "error": "Rate limit in effect"}
+            await self._refresh_token_if_needed()
 
-            # Get product details from your database
-            query = """
-                SELECT 
-                    p.name, 
-                    p.description, 
-                    p.price, 
-                    p.current_stock,
-                    p.category,
-                    p.images,
-                    p.attributes
-                FROM products p
-                WHERE p.id = :product_id
-            """
-            product = self.db.execute(text(query), {"product_id": product_id}).fetchone()
+            # The session is synchronous, so its work runs on a worker thread
+            product = await asyncio.to_thread(self._load_product, product_id)
 
             if not product:
                 return {"success": False, "error": "Product not found"}
 
-            # Prepare data for Mercado Libre
-            meli_data = {
-                "title": product[0],
-                "description": {"plain_text": product[1]},
-                "price": product[2],
-                "available_quantity": product[3],
-                "category_id": self._map_category(product[4]),
-                "pictures": self._format_images(product[5]),
-                "attributes": self._format_attributes(product[6])
-            }
-
-            # Update in Mercado Libre
-            response = requests.put(
-                f"{self.base_url}/items/{meli_item_id}",
-                headers={"Authorization": f"Bearer {self.access_token}"},
-                json=meli_data
+            result = await self.push_listing(meli_item_id, self.build_listing(product))
+            await asyncio.to_thread(
+                self._log_sync, product_id, meli_item_id, result["success"], result.get("error_details")
             )
-
-            if not await self._handle_rate_limit(response):
-                return {"success": False, "error": "Rate limit exceeded"}
-
-            if response.status_code == 200:
-                # Log successful sync
-                self._log_sync(product_id, meli_item_id, True)
-                return {"success": True, "meli_response": response.json()}
-            else:
-                # Log failed sync
-                self._log_sync(product_id, meli_item_id, False, response.text)
-                return {
-                    "success": False,
-                    "error": f"MeLi API error: {response.status_code}",
-                    "details": response.json()
-                }
+            return result
 
         except Exception as e:
-            self._log_sync(product_id, meli_item_id, False, str(e))
+            await asyncio.to_thread(self._log_sync, product_id, meli_item_id, False, str(e))
             return {"success": False, "error": str(e)}
 
+    def _load_product(self, product_id: int):
+        # Get product details from your database
+        return self.db.execute(
+            text(PRODUCT_LISTING_QUERY + " WHERE p.id = :product_id"),
+            {"product_id": product_id}
+        ).fetchone()
+
+    def build_listing(self, product) -> Dict[str, Any]:
+        # Prepare data for Mercado Libre from a PRODUCT_LISTING_QUERY row
+        return {
+            "title": product.name,
+            "description": {"plain_text": product.description},
+            "price": product.price,
+            "available_quantity": product.current_stock,
+            "category_id": self._map_category(product.category),
+            "pictures": self._format_images(product.images),
+            "attributes": self._format_attributes(product.attributes)
+        }
+
+    async def push_listing(self, meli_item_id: str, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """PUT one listing; the caller refreshes the token and logs the result."""
+        response = await self._request(
+            "PUT",
+            f"/items/{meli_item_id}",
+            endpoint="/items/{id}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+            json=listing
+        )
+
+        if not await self._handle_rate_limit(response):
+            return {
+                "success": False,
+                "error": "Rate limit exceeded",
+                "error_details": response.text,
+                "retry_after": self._retry_after(response)
+            }
+
+        if response.status_code == 200:
+            return {"success": True, "meli_response": response.json()}
+        return {
+            "success": False,
+            "error": f"MeLi API error: {response.status_code}",
+            "details": response.json(),
+            "error_details": response.text
+        }
+
     def _log_sync(self, product_id: int, meli_item_id: str, success: bool, error_details: str = None):
         query = """
             INSERT INTO meli_sync_log (
@@ -114,17 +172,14 @@ class MercadoLibreService:
                 :product_id, :meli_item_id, :success, :error_details, :created_at
             )
         """
-        self.db.execute(
-            text(query),
-            {
-                "product_id": product_id,
-                "meli_item_id": meli_item_id,
-                "success": success,
-                "error_details": error_details,
-                "created_at": datetime.utcnow()
-            }
-        )
-        self.db.commit()
+        params = {
+            "product_id": product_id,
+            "meli_item_id": meli_item_id,
+            "success": success,
+            "error_details": error_details,
+            "created_at": datetime.utcnow()
+        }
+        run_write(self.db, lambda session: session.execute(text(query), params))
 
     def _map_category(self, crm_category: str) -> str:
         # Map your CRM categories to Mercado Libre category IDs
@@ -134,4 +189,23 @@ class MercadoLibreService:
             "clothing": "MLA9012"
             # Add more mappings as needed
         }
-        return category_mapping.get(crm_category.lower(), "MLA1234")  # Default category
\ No newline at end of file
+        return category_mapping.get(crm_category.lower(), "MLA1234")  # Default category
+
+    def _format_images(self, images) -> List[Dict[str, str]]:
+        # Stored as a JSON list or a comma separated string of URLs
+        if not images:
+            return []
+        if isinstance(images, str):
+            try:
+                images = json.loads(images)
+            except ValueError:
+                images = images.split(",")
+        return [{"source": url.strip()} for url in images if url and url.strip()]
+
+    def _format_attributes(self, attributes) -> List[Dict[str, Any]]:
+        # Stored as a JSON object of MeLi attribute id -> value
+        if not attributes:
+            return []
+        if isinstance(attributes, str):
+            attributes = json.loads(attributes)
+        return [{"id": key, "value_name": str(value)} for key, value in attributes.items()]
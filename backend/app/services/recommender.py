@@ -1,12 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Dict, Any
 
 class RecommenderService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_product_recommendations(self, client_id: int) -> List[Dict[Any, Any]]:
+    async def get_product_recommendations(self, client_id: int) -> List[Dict[Any, Any]]:
         query = """
             WITH client_preferences AS (
                 SELECT 
@@ -50,7 +50,7 @@ class RecommenderService:
             ORDER BY popularity DESC, avg_price ASC
             LIMIT 10
         """
-        results = self.db.execute(text(query), {"client_id": client_id}).fetchall()
+        results = (await self.db.execute(text(query), {"client_id": client_id})).fetchall()
         return [
             {
                 "product_id": row[0],
@@ -0,0 +1,95 @@
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+
+# Daily rollups of deals keyed by day x product x product_category x sport x
+# owner x status. Every deal write applies a -1 delta for the rows it is about
+# to change and a +1 delta for the rows it produced, inside the same
+# transaction, so the statistics endpoints can read days instead of scanning
+# deals.
+
+KEY_COLUMNS = "day, product_id, product_category, sport, owner_id, status"
+
+class RollupService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_deals(self, deal_ids: List[int]):
+        if deal_ids:
+            self._apply(1, "d.id IN :deal_ids", {"deal_ids": list(deal_ids)})
+
+    def remove_deals(self, deal_ids: List[int]):
+        if deal_ids:
+            self._apply(-1, "d.id IN :deal_ids", {"deal_ids": list(deal_ids)})
+
+    def remove_client_deals(self, client_id: int):
+        # Used before a client's deals are re-keyed (e.g. the client is deleted)
+        self._apply(-1, "d.client_id = :client_id", {"client_id": client_id})
+
+    def _day_expression(self) -> str:
+        if self.db.get_bind().dialect.name == "sqlite":
+            return "date(d.created_at)"
+        return "CAST(d.created_at AS DATE)"
+
+    def _key_expressions(self) -> str:
+        return f"""
+            {self._day_expression()},
+            COALESCE(d.product_id, 0),
+            COALESCE(d.product_category, ''),
+            COALESCE(c.sport, ''),
+            COALESCE(d.owner_id, 0),
+            COALESCE(CAST(d.status AS TEXT), '')
+        """
+
+    def _apply(self, sign: int, condition: str, params: Dict[str, Any]):
+        key = self._key_expressions()
+        params = {**params, "sign": sign}
+
+        rollup_query = f"""
+            INSERT INTO deal_daily_rollups ({KEY_COLUMNS}, deal_count, amount_sum, quantity_sum)
+            SELECT
+                {key},
+                :sign * COUNT(*),
+                :sign * COALESCE(SUM(d.amount), 0),
+                :sign * COALESCE(SUM(d.quantity), 0)
+            FROM deals d
+            LEFT JOIN clients c ON c.id = d.client_id
+            WHERE {condition} AND d.created_at IS NOT NULL
+            GROUP BY {key}
+            ON CONFLICT ({KEY_COLUMNS}) DO UPDATE SET
+                deal_count = deal_daily_rollups.deal_count + excluded.deal_count,
+                amount_sum = deal_daily_rollups.amount_sum + excluded.amount_sum,
+                quantity_sum = deal_daily_rollups.quantity_sum + excluded.quantity_sum
+        """
+
+        clients_query = f"""
+            INSERT INTO deal_daily_rollup_clients ({KEY_COLUMNS}, client_id, deal_count)
+            SELECT
+                {key},
+                d.client_id,
+                :sign * COUNT(*)
+            FROM deals d
+            LEFT JOIN clients c ON c.id = d.client_id
+            WHERE {condition} AND d.created_at IS NOT NULL AND d.client_id IS NOT NULL
+            GROUP BY {key}, d.client_id
+            ON CONFLICT ({KEY_COLUMNS}, client_id) DO UPDATE SET
+                deal_count = deal_daily_rollup_clients.deal_count + excluded.deal_count
+        """
+
+        self._execute(rollup_query, params)
+        self._execute(clients_query, params)
+
+        if sign < 0:
+            # Drop emptied cells so a client without deals stops counting as distinct
+            for table in ("deal_daily_rollups", "deal_daily_rollup_clients"):
+                self._execute(
+                    f"DELETE FROM {table} WHERE deal_count <= 0 AND day IN ("
+                    f"SELECT {self._day_expression()} FROM deals d WHERE {condition})",
+                    params
+                )
+
+    def _execute(self, query: str, params: Dict[str, Any]):
+        statement = text(query)
+        if "deal_ids" in params:
+            statement = statement.bindparams(bindparam("deal_ids", expanding=True))
+        self.db.execute(statement, params)
@@ -0,0 +1,136 @@
+from sqlalchemy import DateTime, Float, Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# "Another won purchase by the same client within N days" without a
+# deals x deals self-join: won deals are streamed once ordered by
+# (client_id, created_at) and every collector sweeps one client's deals with a
+# sliding window. Cost is linear in the number of deals plus the number of
+# distinct categories inside a window, never in the number of pairs.
+
+class WonDeal(NamedTuple):
+    client_id: int
+    created_at: datetime
+    product_category: Optional[str]
+    amount: float
+    sport: Optional[str]
+
+WON_DEALS_QUERY = text("""
+    SELECT d.client_id, d.created_at, d.product_category, COALESCE(d.amount, 0) as amount, c.sport
+    FROM deals d
+    JOIN clients c ON c.id = d.client_id
+    WHERE d.status = 'won' AND d.created_at IS NOT NULL
+    ORDER BY d.client_id, d.created_at, d.id
+""").columns(
+    client_id=Integer, created_at=DateTime, product_category=String, amount=Float, sport=String
+)
+
+class RepeatOrders:
+    """Per won deal, the later won deals of the same client and category
+    within the window, summed by (month, category, sport)."""
+
+    def __init__(self, window: timedelta):
+        self.window = window
+        self.counts: Dict[Tuple[int, Optional[str], Optional[str]], int] = defaultdict(int)
+
+    def add_client(self, deals: List[WonDeal]):
+        by_category: Dict[Optional[str], List[WonDeal]] = defaultdict(list)
+        for deal in deals:
+            by_category[deal.product_category].append(deal)
+
+        for category, series in by_category.items():
+            # Two pointers: deals in (t, t + window] = upto(t + window) - upto(t)
+            tied = in_window = 0
+            for deal in series:
+                while tied < len(series) and series[tied].created_at <= deal.created_at:
+                    tied += 1
+                in_window = max(in_window, tied)
+                while (in_window < len(series)
+                       and series[in_window].created_at <= deal.created_at + self.window):
+                    in_window += 1
+                key = (deal.created_at.month, category, deal.sport)
+                self.counts[key] += in_window - tied
+
+class PairCombinations:
+    """Pairs of won deals of one client where the second follows the first
+    within the window, counted by (first category, second category, sport,
+    month of the first) with the summed pair amount."""
+
+    def __init__(self, window: timedelta, since: Optional[date] = None):
+        self.window = window
+        self.since = since
+        self.pairs: Dict[Tuple[Optional[str], Optional[str], Optional[str], int], List[float]] = (
+            defaultdict(lambda: [0, 0.0])
+        )
+
+    def add_client(self, deals: List[WonDeal]):
+        recent: deque = deque()
+        # (category, month) -> [deals in window, summed amount]
+        open_cells: Dict[Tuple[Optional[str], int], List[float]] = defaultdict(lambda: [0, 0.0])
+
+        for deal in deals:
+            if self.since is not None and deal.created_at.date() < self.since:
+                continue
+            while recent and recent[0].created_at < deal.created_at - self.window:
+                expired = recent.popleft()
+                cell = open_cells[(expired.product_category, expired.created_at.month)]
+                cell[0] -= 1
+                cell[1] -= expired.amount
+                if cell[0] == 0:
+                    del open_cells[(expired.product_category, expired.created_at.month)]
+
+            for (category, month), (count, amount) in open_cells.items():
+                pair = self.pairs[(category, deal.product_category, deal.sport, month)]
+                pair[0] += count
+                pair[1] += amount + count * deal.amount
+
+            recent.append(deal)
+            cell = open_cells[(deal.product_category, deal.created_at.month)]
+            cell[0] += 1
+            cell[1] += deal.amount
+
+class CategoryRetention:
+    """Per category, clients with a won deal and clients who bought the
+    category again within the window of an earlier purchase."""
+
+    def __init__(self, window: timedelta):
+        self.window = window
+        self.initial: Dict[Optional[str], int] = defaultdict(int)
+        self.retained: Dict[Optional[str], int] = defaultdict(int)
+
+    def add_client(self, deals: List[WonDeal]):
+        last_seen: Dict[Optional[str], datetime] = {}
+        retained = set()
+        for deal in deals:
+            category = deal.product_category
+            previous = last_seen.get(category)
+            if previous is None:
+                self.initial[category] += 1
+            elif (category not in retained
+                  and previous < deal.created_at <= previous + self.window):
+                retained.add(category)
+                self.retained[category] += 1
+            last_seen[category] = deal.created_at
+
+def sweep(deals: Iterable[WonDeal], *collectors):
+    # Deals must arrive ordered by (client_id, created_at)
+    for _, client_deals in groupby(deals, key=lambda deal: deal.client_id):
+        batch = list(client_deals)
+        for collector in collectors:
+            collector.add_client(batch)
+
+async def sweep_won_deals(db: AsyncSession, *collectors):
+    # Streams rows so only one client's deals are held in memory at a time
+    result = await db.stream(WON_DEALS_QUERY)
+    batch: List[WonDeal] = []
+    async for row in result:
+        deal = WonDeal(*row)
+        if batch and batch[-1].client_id != deal.client_id:
+            sweep(batch, *collectors)
+            batch = []
+        batch.append(deal)
+    if batch:
+        sweep(batch, *collectors)
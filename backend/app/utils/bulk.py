@@ -0,0 +1,53 @@
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Tuple, Type
+from .. import schemas
+from ..config import settings
+
+def check_batch_size(items: List[Any]):
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request"
+        )
+
+def validate_items(
+    items: List[Dict[str, Any]],
+    schema: Type[BaseModel]
+) -> Tuple[Dict[int, schemas.BulkItemResult], List[Tuple[int, BaseModel]]]:
+    # Validate every item up front; invalid ones become per-item failures
+    # instead of rejecting the whole batch
+    check_batch_size(items)
+    failures: Dict[int, schemas.BulkItemResult] = {}
+    valid: List[Tuple[int, BaseModel]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            failures[index] = schemas.BulkItemResult(
+                index=index,
+                success=False,
+                error="; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                )
+            )
+    return failures, valid
+
+def dialect_insert(session: Session, model):
+    # INSERT ... ON CONFLICT is dialect specific
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def bulk_response(results: Dict[int, schemas.BulkItemResult]) -> schemas.BulkResponse:
+    ordered = [results[index] for index in sorted(results)]
+    succeeded = sum(1 for result in ordered if result.success)
+    return schemas.BulkResponse(
+        succeeded=succeeded,
+        failed=len(ordered) - succeeded,
+        results=ordered
+    )
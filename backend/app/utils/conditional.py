@@ -0,0 +1,71 @@
+from fastapi import Request, Response
+from typing import Optional
+import hashlib
+import json
+import time
+from ..services.cache import AsyncCacheService, CacheUnavailable
+
+# Conditional GETs for read-only endpoints. The ETag is derived from the
+# data-version counters that CRUD writes bump (see CacheService.invalidate_tags),
+# so a matching If-None-Match is answered with 304 before the endpoint touches
+# the database or serializes anything.
+
+class NotModified(Exception):
+    def __init__(self, etag: str, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": exc.etag, "Cache-Control": exc.cache_control}
+    )
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" match
+    return "*" in candidates or etag.removeprefix("W/") in (
+        candidate.removeprefix("W/") for candidate in candidates
+    )
+
+def conditional(
+    *tags: str,
+    namespace: Optional[str] = None,
+    max_age: int = 0,
+    period: int = 3600
+):
+    """Dependency adding ETag and Cache-Control to a GET endpoint.
+
+    `tags` are formatted with the path parameters (e.g. "client:{client_id}").
+    ETags also roll over every `period` seconds so results that depend on the
+    current date are refetched. If the versions can't be read, or changed too
+    recently for the replica to have caught up, the endpoint runs normally
+    without an ETag.
+    """
+    cache_control = f"private, max-age={max_age}" if max_age else "private, no-cache"
+
+    async def dependency(request: Request, response: Response):
+        response.headers["Cache-Control"] = cache_control
+        try:
+            versions = await AsyncCacheService.data_versions(
+                [tag.format(**request.path_params) for tag in tags], namespace
+            )
+        except CacheUnavailable:
+            return
+        if not AsyncCacheService.versions_settled(versions):
+            # A recent write may not have reached the replica serving this
+            # response, so it mustn't be revalidated (or reused) under its ETag
+            response.headers["Cache-Control"] = "private, no-cache"
+            return
+        validator = json.dumps(
+            [request.url.path, str(request.query_params), versions, int(time.time() // period)],
+            sort_keys=True
+        )
+        etag = f'W/"{hashlib.sha1(validator.encode()).hexdigest()[:20]}"'
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise NotModified(etag, cache_control)
+        response.headers["ETag"] = etag
+
+    return dependency
@@ -0,0 +1,34 @@
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+def constraint_kind(error: IntegrityError) -> Optional[str]:
+    # SQLSTATE on Postgres drivers, message text on SQLite
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    if code == FOREIGN_KEY_VIOLATION:
+        return "foreign_key"
+    if code == UNIQUE_VIOLATION:
+        return "unique"
+
+    message = str(error.orig).lower()
+    if "foreign key" in message:
+        return "foreign_key"
+    if "unique" in message:
+        return "unique"
+    return None
+
+def integrity_http_error(
+    error: IntegrityError,
+    not_found: str = "Related record not found",
+    conflict: str = "Record already exists"
+) -> HTTPException:
+    # Map constraint violations to the responses the pre-check SELECTs used to give
+    kind = constraint_kind(error)
+    if kind == "foreign_key":
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    if kind == "unique":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=conflict)
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity constraint violated")
@@ -0,0 +1,63 @@
+import math
+from typing import Dict, Mapping, Optional
+
+# Latency histogram with fixed log-scale buckets: bucket i holds values in
+# (GROWTH ** (i - 1), GROWTH ** i] milliseconds, so every process agrees on
+# the boundaries and histograms merge by adding counts. Reporting the
+# geometric middle of a bucket keeps percentiles within ~9% of the exact value.
+
+GROWTH = 2 ** 0.25
+# GROWTH ** 100 ms is about 9 hours; anything slower lands in the last bucket
+MAX_INDEX = 100
+
+def bucket_index(seconds: float) -> int:
+    milliseconds = seconds * 1000
+    if milliseconds <= 1:
+        return 0
+    return min(MAX_INDEX, math.ceil(math.log(milliseconds, GROWTH) - 1e-9))
+
+def bucket_value(index: int) -> float:
+    """Representative value of a bucket, in seconds."""
+    if index <= 0:
+        return 0.001
+    return GROWTH ** (index - 0.5) / 1000
+
+class LatencyHistogram:
+    def __init__(self, counts: Optional[Mapping[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, seconds: float, count: int = 1):
+        self.add_bucket(bucket_index(seconds), count)
+
+    def add_bucket(self, index: int, count: int):
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for index, count in other.counts.items():
+            self.add_bucket(index, count)
+        return self
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Value in seconds below which a fraction `q` of samples fall."""
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bucket_value(index)
+        return bucket_value(max(self.counts))
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.total,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99)
+        }
@@ -0,0 +1,85 @@
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Query, Session
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+# Keyset pagination. List endpoints walk rows by ascending id, the insertion
+# order they returned before cursors existed, so skip/limit callers see the
+# same pages as before. Cursors are opaque base64 tokens holding the ordering
+# key, so it can change without breaking clients: the id for the list
+# endpoints, (created_at, id) for the admin error log, which pages newest first.
+
+def _encode(key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    return _encode([created_at.isoformat(), id])
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+def encode_id_cursor(id: int) -> str:
+    return _encode([id])
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        (id,) = _decode(cursor)
+        return int(id)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+def keyset_paginate(
+    query: Query,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    if limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be at least 1"
+        )
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.filter(id_column > decode_id_cursor(cursor))
+    elif skip:
+        # Legacy offset paging, kept for existing callers
+        query = query.offset(skip)
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_id_cursor(last.id)
+
+def approximate_count(db: Session, table: str) -> int:
+    # Planner estimate on Postgres (no table scan); exact count elsewhere
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table}
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return db.execute(select(func.count()).select_from(text(table))).scalar()
@@ -0,0 +1,75 @@
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+from ..config import settings
+
+class QueryGroup:
+    # Independent reads of one endpoint, each on its own pooled connection, so
+    # the endpoint takes max(query) instead of sum(query). Sessions are siblings
+    # of the request session: same bind/replica routing and pin key.
+
+    def __init__(self, db: AsyncSession, timeout: Optional[float] = None):
+        self.db = db
+        self.timeout = settings.QUERY_GROUP_TIMEOUT if timeout is None else timeout
+        self._work: Dict[str, Callable[[AsyncSession], Awaitable[Any]]] = {}
+
+    def add(
+        self,
+        name: str,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        first: bool = False
+    ) -> "QueryGroup":
+        async def _fetch(session: AsyncSession):
+            result = await session.execute(text(query), params or {})
+            return result.first() if first else result.fetchall()
+
+        self._work[name] = _fetch
+        return self
+
+    def add_call(self, name: str, fn: Callable[[AsyncSession], Awaitable[Any]]) -> "QueryGroup":
+        self._work[name] = fn
+        return self
+
+    def _session(self) -> AsyncSession:
+        return AsyncSession(
+            bind=self.db.bind,
+            sync_session_class=type(self.db.sync_session),
+            info=dict(self.db.info),
+            autoflush=False,
+            expire_on_commit=False
+        )
+
+    async def _run_one(self, fn: Callable[[AsyncSession], Awaitable[Any]], limit: asyncio.Semaphore):
+        async with limit:
+            async with self._session() as session:
+                return await fn(session)
+
+    async def run(self) -> Dict[str, Any]:
+        limit = asyncio.Semaphore(max(settings.QUERY_GROUP_CONCURRENCY, 1))
+        tasks = {
+            name: asyncio.create_task(self._run_one(fn, limit))
+            for name, fn in self._work.items()
+        }
+        if not tasks:
+            return {}
+
+        done, pending = await asyncio.wait(
+            tasks.values(), timeout=self.timeout, return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        if pending:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Analytics queries did not finish within {self.timeout}s"
+            )
+        return {name: task.result() for name, task in tasks.items()}
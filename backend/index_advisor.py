@@ -0,0 +1,117 @@
+"""Replay the statistics endpoints under EXPLAIN and report sequential scans.
+
+Usage: python index_advisor.py [--min-rows 10000] [--client-id 1]
+"""
+from app.database import AsyncSessionLocal, async_engine
+from app.routers.statistics import router as statistics_router
+from fastapi.params import Depends
+from sqlalchemy import event, text
+from typing import Any, Dict, List, Tuple
+import argparse
+import asyncio
+import inspect
+import json
+
+def _endpoint_kwargs(endpoint, db, client_id: int) -> Dict[str, Any]:
+    kwargs = {}
+    for name, param in inspect.signature(endpoint).parameters.items():
+        if isinstance(param.default, Depends):
+            kwargs[name] = db
+        elif name == "client_id":
+            kwargs[name] = client_id
+        elif param.default is not inspect.Parameter.empty:
+            kwargs[name] = param.default
+    return kwargs
+
+async def capture_statements(client_id: int) -> List[Tuple[str, str, Any]]:
+    captured: List[Tuple[str, str, Any]] = []
+    current_path = {"path": None}
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((current_path["path"], statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        for route in statistics_router.routes:
+            if "GET" not in getattr(route, "methods", set()):
+                continue
+            current_path["path"] = route.path
+            async with AsyncSessionLocal() as db:
+                try:
+                    await route.endpoint(**_endpoint_kwargs(route.endpoint, db, client_id))
+                except Exception as e:
+                    print(f"! {route.path}: {str(e)[:120]}")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", _capture)
+    return captured
+
+def _postgres_seq_scans(plan: Dict[str, Any]) -> List[str]:
+    tables = []
+    if plan.get("Node Type") == "Seq Scan":
+        tables.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        tables.extend(_postgres_seq_scans(child))
+    return tables
+
+async def table_sizes(conn) -> Dict[str, float]:
+    if conn.dialect.name == "postgresql":
+        rows = await conn.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"
+        ))
+        return {row[0]: float(row[1]) for row in rows}
+
+    sizes = {}
+    tables = await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+    for (table,) in tables.fetchall():
+        sizes[table] = float((await conn.execute(text(f'SELECT COUNT(*) FROM "{table}"'))).scalar())
+    return sizes
+
+async def explain_seq_scans(statement: str, parameters: Any, conn) -> List[str]:
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return _postgres_seq_scans(plan[0]["Plan"])
+
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    tables = []
+    for row in result.fetchall():
+        detail = str(row[-1])
+        if detail.startswith("SCAN ") and "CONSTANT ROW" not in detail:
+            tables.append(detail.split()[1])
+    return tables
+
+async def run(min_rows: int, client_id: int):
+    captured = await capture_statements(client_id)
+    findings = []
+
+    async with async_engine.connect() as conn:
+        sizes = await table_sizes(conn)
+        for path, statement, parameters in captured:
+            try:
+                scanned = await explain_seq_scans(statement, parameters, conn)
+            except Exception as e:
+                print(f"! EXPLAIN failed for {path}: {str(e)[:120]}")
+                await conn.rollback()
+                continue
+            for table in scanned:
+                rows = sizes.get(table, 0)
+                if rows >= min_rows:
+                    findings.append((path, table, rows, " ".join(statement.split())[:160]))
+
+    print(f"\nReplayed {len(captured)} statements from {len(statistics_router.routes)} routes")
+    if not findings:
+        print(f"No sequential scans on tables with >= {min_rows} rows")
+        return
+
+    print(f"\nSequential scans on tables with >= {min_rows} rows:")
+    for path, table, rows, statement in sorted(findings, key=lambda f: -f[2]):
+        print(f"\n{path}\n  table: {table} (~{int(rows)} rows)\n  sql:   {statement}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-rows", type=int, default=10000)
+    parser.add_argument("--client-id", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.min_rows, args.client_id))
@@ -0,0 +1,47 @@
+"""Push product listings to Mercado Libre in bulk.
+
+Usage: python meli_sync.py (--ids 1,2,3 | --since 2024-01-01T00:00) [--concurrency 8]
+"""
+from app.database import SessionLocal
+from app.services.meli_http import close_meli_client
+from app.services.meli_sync import MeliBulkSync
+from datetime import datetime
+from typing import Any, Dict
+import argparse
+import asyncio
+import sys
+
+async def print_progress(progress: Dict[str, Any]):
+    print(
+        f"{progress['done']}/{progress['total']} synced "
+        f"({progress['succeeded']} ok, {progress['failed']} failed)",
+        file=sys.stderr
+    )
+
+async def run(product_ids, since, concurrency) -> int:
+    db = SessionLocal()
+    try:
+        progress = await MeliBulkSync(db, concurrency=concurrency).run(
+            product_ids, since, on_progress=print_progress
+        )
+    finally:
+        db.close()
+        await close_meli_client()
+
+    for item in progress["results"]:
+        if not item["success"]:
+            print(f"product {item['product_id']} ({item['meli_item_id']}): {item['error']}")
+    print(
+        f"Synced {progress['succeeded']}/{progress['total']} listings "
+        f"in {progress['elapsed_seconds']}s"
+    )
+    return 1 if progress["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ids", type=lambda value: [int(part) for part in value.split(",") if part])
+    target.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.ids, args.since, args.concurrency)))
@@ -0,0 +1,84 @@
+import time
+from ..app.services import cache
+from ..app.services.cache import LocalCache, _MISSING
+from ..app.services.cache_metrics import CacheMetrics, key_prefix
+
+class TestLocalCache:
+    def test_evicts_least_recently_used_by_size(self):
+        cache = LocalCache(max_bytes=10, max_ttl=60)
+        cache.set("a", "aaaa", 4)
+        cache.set("b", "bbbb", 4)
+        assert cache.get("a") == "aaaa"  # "b" is now least recently used
+
+        cache.set("c", "cccc", 4)
+        assert cache.get("b") is _MISSING
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+        assert cache.stats()["bytes"] == 8
+
+    def test_skips_values_larger_than_the_budget(self):
+        cache = LocalCache(max_bytes=10, max_ttl=60)
+        cache.set("big", "x" * 11, 11)
+        assert cache.get("big") is _MISSING
+        assert cache.stats()["entries"] == 0
+
+    def test_ttl_is_capped_and_expires(self):
+        cache = LocalCache(max_bytes=100, max_ttl=0.05)
+        cache.set("a", 1, 1, ttl=3600)
+        assert cache.get("a") == 1
+        time.sleep(0.06)
+        assert cache.get("a") is _MISSING
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_discard_releases_bytes(self):
+        cache = LocalCache(max_bytes=100, max_ttl=60)
+        cache.set("a", 1, 5)
+        cache.discard("a")
+        assert cache.get("a") is _MISSING
+        assert cache.stats()["bytes"] == 0
+
+    def test_reports_evictions(self):
+        evicted = []
+        cache = LocalCache(max_bytes=4, max_ttl=60, on_evict=evicted.append)
+        cache.set("a", 1, 4)
+        cache.set("b", 2, 4)
+        assert evicted == ["a"]
+        assert cache.stats()["evictions"] == 1
+
+class TestCacheMetrics:
+    def test_groups_keys_by_prefix(self):
+        assert key_prefix("stats:v3:client_insights_42") == "stats:v*:client_insights_*"
+
+        metrics = CacheMetrics()
+        metrics.record_get("client_insights_1", True, 0.001, local=True)
+        metrics.record_get("client_insights_2", False, 0.002)
+        metrics.record_set("client_insights_2", 300, 0.003)
+        snapshot = metrics.snapshot()["client_insights_*"]
+        assert (snapshot["hits"], snapshot["local_hits"], snapshot["misses"]) == (1, 1, 1)
+        assert snapshot["hit_ratio"] == 0.5
+        assert snapshot["bytes_written"] == 300
+
+    def test_tracks_largest_values(self):
+        metrics = CacheMetrics(track_largest=2)
+        for key, size in [("a", 10), ("b", 30), ("c", 20), ("d", 5)]:
+            metrics.record_set(key, size, 0.001)
+        assert [entry["key"] for entry in metrics.largest(5)] == ["b", "c"]
+        metrics.record_delete("b")
+        assert [entry["key"] for entry in metrics.largest(5)] == ["c"]
+
+class TestReplicaLag:
+    def test_new_versions_settle_after_the_lag(self, monkeypatch):
+        monkeypatch.setattr(cache, "REPLICA_LAG", 0.05)
+        monkeypatch.setattr(cache, "_version_seen", {})
+        assert not cache._versions_settled({"deals": 1})
+        time.sleep(0.06)
+        assert cache._versions_settled({"deals": 1})
+
+        # A bump starts the wait again, for every entry that includes the tag
+        assert not cache._versions_settled({"deals": 2, "clients": 1})
+        time.sleep(0.06)
+        assert cache._versions_settled({"deals": 2, "clients": 1})
+
+    def test_without_a_replica_versions_are_always_settled(self, monkeypatch):
+        monkeypatch.setattr(cache, "REPLICA_LAG", 0.0)
+        assert cache._versions_settled({"deals": 7})
@@ -0,0 +1,42 @@
+import json
+import pytest
+from ..app.services.cache_codec import CacheCodec, HEADER_FLAG, SERIALIZERS
+
+VALUE = {
+    "months": [{"month": month, "revenue": month * 1234.5, "category": "protein"} for month in range(1, 13)],
+    "total": 9876.25,
+    "empty": None
+}
+
+class TestCacheCodec:
+    @pytest.mark.parametrize("serializer", sorted(SERIALIZERS))
+    def test_round_trip(self, serializer):
+        codec = CacheCodec(serializer=serializer, compressor="zlib", compress_min_bytes=64)
+        data = codec.encode(VALUE)
+        assert data[0] & HEADER_FLAG
+        assert codec.decode(data) == VALUE
+
+    def test_compresses_only_above_threshold(self):
+        codec = CacheCodec(serializer="json", compressor="zlib", compress_min_bytes=64)
+        small = codec.encode({"a": 1})
+        assert small[1:] == b'{"a": 1}'
+
+        large = codec.encode(VALUE)
+        assert len(large) < len(json.dumps(VALUE))
+        assert codec.stats()["compressed"] == 1
+        assert codec.stats()["bytes_saved"] > 0
+
+    def test_reads_legacy_json_entries(self):
+        codec = CacheCodec(serializer="json", compressor="none")
+        assert codec.decode(json.dumps(VALUE).encode()) == VALUE
+        assert codec.stats()["legacy_decoded"] == 1
+
+    def test_decodes_entries_written_with_another_configuration(self):
+        writer = CacheCodec(serializer="json", compressor="zlib", compress_min_bytes=0)
+        reader = CacheCodec(serializer="json", compressor="none")
+        assert reader.decode(writer.encode(VALUE)) == VALUE
+
+    def test_rejects_unknown_header(self):
+        codec = CacheCodec(serializer="json", compressor="none")
+        with pytest.raises(ValueError):
+            codec.decode(bytes((HEADER_FLAG | 0x07,)) + b"{}")
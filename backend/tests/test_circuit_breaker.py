@@ -0,0 +1,56 @@
+import asyncio
+import time
+import pytest
+from ..app.services import cache
+from ..app.utils.circuit_breaker import CircuitBreaker
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats()["trips"] == 2
+
+    def test_release_frees_the_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+class TestGuardedProbe:
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_does_not_wedge_the_circuit(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        monkeypatch.setattr(cache, "cache_breaker", breaker)
+
+        probe = asyncio.create_task(cache._guarded_async(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
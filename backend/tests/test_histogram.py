@@ -0,0 +1,38 @@
+import math
+import random
+from ..app.utils.histogram import LatencyHistogram, bucket_index, bucket_value
+
+def exact_percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+class TestLatencyHistogram:
+    def test_percentiles_within_bucket_error(self):
+        rng = random.Random(7)
+        samples = [rng.lognormvariate(-3, 1) for _ in range(5000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = exact_percentile(samples, q)
+            assert abs(histogram.percentile(q) - exact) / exact < 0.1
+
+    def test_merge_matches_single_histogram(self):
+        rng = random.Random(11)
+        samples = [rng.uniform(0.001, 2) for _ in range(1000)]
+        combined = LatencyHistogram()
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for position, sample in enumerate(samples):
+            combined.record(sample)
+            (first if position % 2 else second).record(sample)
+
+        assert first.merge(second).counts == combined.counts
+
+    def test_bucket_bounds(self):
+        assert bucket_index(0) == 0
+        assert bucket_index(0.001) == 0
+        assert bucket_index(0.002) == 4
+        assert bucket_index(10 ** 6) == 100
+        assert bucket_value(4) < 0.002
+        assert LatencyHistogram().percentile(0.5) is None
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from ..app.services.meli_sync import MeliBulkSync
+
+@pytest.fixture
+def db():
+    # One shared connection: the sync runs its queries on a worker thread
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    session = Session(engine)
+    session.execute(text("""
+        CREATE TABLE products (
+            id INTEGER PRIMARY KEY, meli_item_id TEXT, name TEXT, description TEXT,
+            price REAL, current_stock INTEGER, category TEXT, images TEXT,
+            attributes TEXT, updated_at DATETIME
+        )
+    """))
+    session.execute(text("""
+        CREATE TABLE meli_sync_log (
+            id INTEGER PRIMARY KEY, product_id INTEGER, meli_item_id TEXT,
+            success BOOLEAN, error_details TEXT, created_at DATETIME
+        )
+    """))
+    session.execute(
+        text("""
+            INSERT INTO products (id, meli_item_id, name, category, updated_at)
+            VALUES (:id, :meli_item_id, :name, 'equipment', :updated_at)
+        """),
+        [
+            {"id": 1, "meli_item_id": "MLA1", "name": "Ball", "updated_at": datetime(2024, 1, 1)},
+            {"id": 2, "meli_item_id": None, "name": "Net", "updated_at": datetime(2024, 3, 1)},
+            {"id": 3, "meli_item_id": "MLA3", "name": "Bat", "updated_at": datetime(2024, 3, 1)}
+        ] + [
+            {"id": id, "meli_item_id": f"MLA{id}", "name": "Glove", "updated_at": datetime(2024, 1, 1)}
+            for id in range(10, 40)
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+
+class MockMeli:
+    # Stands in for api.mercadolibre.com and tracks how many PUTs overlap
+    def __init__(self, fail_items=(), throttle_first: int = 0):
+        self.fail_items = set(fail_items)
+        self.throttle_first = throttle_first
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.puts = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/oauth/token":
+            return httpx.Response(200, json={"access_token": "token", "expires_in": 3600})
+        self.puts += 1
+        if self.puts <= self.throttle_first:
+            return httpx.Response(429, headers={"Retry-After": "0.2"}, json={"message": "slow down"})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        item_id = request.url.path.rsplit("/", 1)[-1]
+        if item_id in self.fail_items:
+            return httpx.Response(400, json={"message": "invalid listing"})
+        return httpx.Response(200, json={"id": item_id})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler), base_url="https://meli.test")
+
+class TestMeliBulkSync:
+    def test_loads_listed_products_by_id(self, db):
+        products = MeliBulkSync(db, concurrency=4).load_products(product_ids=[1, 2, 3])
+        assert [product.id for product in products] == [1, 3]
+
+    def test_loads_products_changed_since(self, db):
+        products = MeliBulkSync(db, concurrency=4).load_products(since=datetime(2024, 2, 1))
+        assert [product.meli_item_id for product in products] == ["MLA3"]
+
+    def test_requires_a_selection(self, db):
+        with pytest.raises(ValueError):
+            MeliBulkSync(db, concurrency=4).load_products()
+
+    @pytest.mark.asyncio
+    async def test_bounds_concurrency_and_isolates_failures(self, db):
+        meli = MockMeli(fail_items={"MLA12"})
+        reports = []
+
+        async def on_progress(progress):
+            reports.append((progress["done"], progress["succeeded"], progress["failed"]))
+
+        product_ids = list(range(10, 40)) + [2]
+        progress = await MeliBulkSync(db, concurrency=4, client=meli.client()).run(
+            product_ids, on_progress=on_progress
+        )
+
+        assert meli.max_in_flight == 4
+        assert progress["status"] == "completed"
+        assert (progress["total"], progress["succeeded"], progress["failed"]) == (31, 29, 2)
+        failed = {item["product_id"]: item["error"] for item in progress["results"] if not item["success"]}
+        assert failed == {12: "MeLi API error: 400", 2: "Product not found or not listed on MeLi"}
+        assert reports[-1] == (31, 29, 2)
+        assert [done for done, _, _ in reports] == sorted(done for done, _, _ in reports)
+
+        logged = db.execute(text("SELECT COUNT(*), SUM(success) FROM meli_sync_log")).fetchone()
+        assert tuple(logged) == (30, 29)
+
+    @pytest.mark.asyncio
+    async def test_waits_out_rate_limit_instead_of_failing(self, db):
+        meli = MockMeli(throttle_first=3)
+        progress = await MeliBulkSync(db, concurrency=3, client=meli.client()).run(list(range(10, 20)))
+
+        assert progress["rate_limited"] == 3
+        assert (progress["succeeded"], progress["failed"]) == (10, 0)
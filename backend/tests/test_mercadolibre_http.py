@@ -0,0 +1,24 @@
+import asyncio
+import time
+import httpx
+import pytest
+from ..app.services.mercadolibre import MercadoLibreService
+
+def mock_meli(delay: float) -> httpx.AsyncClient:
+    # Stands in for api.mercadolibre.com; every response takes `delay` seconds
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1]})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://meli.test")
+
+class TestMercadoLibreHttp:
+    @pytest.mark.asyncio
+    async def test_slow_calls_do_not_block_each_other(self):
+        service = MercadoLibreService(db=None, client=mock_meli(0.2))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            service._request("GET", f"/items/{index}", endpoint="/items/{id}") for index in range(10)
+        ])
+        assert [response.json()["id"] for response in responses] == [str(index) for index in range(10)]
+        # Sequential blocking calls would take 2s
+        assert time.perf_counter() - started < 1.0
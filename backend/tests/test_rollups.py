@@ -0,0 +1,138 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from ..app.services.rollups import RollupService
+
+FRESH_ROLLUPS = """
+    SELECT
+        date(d.created_at), COALESCE(d.product_id, 0), COALESCE(d.product_category, ''),
+        COALESCE(c.sport, ''), COALESCE(d.owner_id, 0), COALESCE(d.status, ''),
+        COUNT(*), COALESCE(SUM(d.amount), 0), COALESCE(SUM(d.quantity), 0)
+    FROM deals d
+    LEFT JOIN clients c ON c.id = d.client_id
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ORDER BY 1, 2, 3, 4, 5, 6
+"""
+
+FRESH_CLIENTS = """
+    SELECT
+        date(d.created_at), COALESCE(d.product_id, 0), COALESCE(d.product_category, ''),
+        COALESCE(c.sport, ''), COALESCE(d.owner_id, 0), COALESCE(d.status, ''), d.client_id, COUNT(*)
+    FROM deals d
+    LEFT JOIN clients c ON c.id = d.client_id
+    WHERE d.client_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+    ORDER BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+@pytest.fixture
+def db():
+    session = Session(create_engine("sqlite://"))
+    # Same keys as the add_deal_rollups migration; ON CONFLICT relies on them
+    session.execute(text("""
+        CREATE TABLE deal_daily_rollups (
+            day DATE, product_id INTEGER, product_category TEXT, sport TEXT, owner_id INTEGER,
+            status TEXT, deal_count INTEGER NOT NULL, amount_sum REAL NOT NULL, quantity_sum REAL NOT NULL,
+            PRIMARY KEY (day, product_id, product_category, sport, owner_id, status)
+        )
+    """))
+    session.execute(text("""
+        CREATE TABLE deal_daily_rollup_clients (
+            day DATE, product_id INTEGER, product_category TEXT, sport TEXT, owner_id INTEGER,
+            status TEXT, client_id INTEGER, deal_count INTEGER NOT NULL,
+            PRIMARY KEY (day, product_id, product_category, sport, owner_id, status, client_id)
+        )
+    """))
+    session.execute(text("CREATE TABLE clients (id INTEGER PRIMARY KEY, sport TEXT)"))
+    session.execute(text("""
+        CREATE TABLE deals (
+            id INTEGER PRIMARY KEY, client_id INTEGER, owner_id INTEGER, status TEXT,
+            product_id INTEGER, product_category TEXT, amount REAL, quantity INTEGER, created_at DATETIME
+        )
+    """))
+    session.execute(
+        text("INSERT INTO clients (id, sport) VALUES (:id, :sport)"),
+        [{"id": 1, "sport": "tennis"}, {"id": 2, "sport": "running"}, {"id": 3, "sport": None}]
+    )
+    yield session
+    session.close()
+
+def insert_deals(db, *deals):
+    ids = []
+    for deal in deals:
+        ids.append(db.execute(
+            text("""
+                INSERT INTO deals (client_id, owner_id, status, product_id, product_category, amount, quantity, created_at)
+                VALUES (:client_id, :owner_id, :status, :product_id, :product_category, :amount, :quantity, :created_at)
+                RETURNING id
+            """),
+            {"owner_id": 1, "product_id": None, "quantity": 1, **deal}
+        ).scalar_one())
+    RollupService(db).add_deals(ids)
+    return ids
+
+def update_deal(db, deal_id, **changes):
+    # Same sequence as deals._write_deal_changes
+    rollups = RollupService(db)
+    rollups.remove_deals([deal_id])
+    assignments = ", ".join(f"{column} = :{column}" for column in changes)
+    db.execute(text(f"UPDATE deals SET {assignments} WHERE id = :id"), {**changes, "id": deal_id})
+    rollups.add_deals([deal_id])
+
+def assert_matches_deals(db):
+    rollups = db.execute(text("""
+        SELECT day, product_id, product_category, sport, owner_id, status, deal_count, amount_sum, quantity_sum
+        FROM deal_daily_rollups ORDER BY 1, 2, 3, 4, 5, 6
+    """)).fetchall()
+    clients = db.execute(text("""
+        SELECT day, product_id, product_category, sport, owner_id, status, client_id, deal_count
+        FROM deal_daily_rollup_clients ORDER BY 1, 2, 3, 4, 5, 6, 7
+    """)).fetchall()
+    assert [tuple(row) for row in rollups] == [tuple(row) for row in db.execute(text(FRESH_ROLLUPS))]
+    assert [tuple(row) for row in clients] == [tuple(row) for row in db.execute(text(FRESH_CLIENTS))]
+
+class TestRollupMaintenance:
+    def test_create_update_delete_match_group_by(self, db):
+        ids = insert_deals(
+            db,
+            {"client_id": 1, "status": "won", "product_id": 7, "product_category": "shoes", "amount": 100, "created_at": datetime(2024, 5, 1, 9)},
+            {"client_id": 1, "status": "won", "product_id": 7, "product_category": "shoes", "amount": 50, "created_at": datetime(2024, 5, 1, 17)},
+            {"client_id": 2, "status": "open", "product_category": "rackets", "amount": 80, "created_at": datetime(2024, 5, 2)},
+            {"client_id": 3, "status": "won", "product_category": None, "amount": 20, "created_at": datetime(2024, 5, 2)},
+            {"client_id": 2, "status": "won", "product_category": "shoes", "amount": 75, "quantity": 3, "created_at": datetime(2024, 5, 1)}
+        )
+        assert_matches_deals(db)
+
+        # Move between cells: product, category, status, owner, client and day
+        update_deal(db, ids[1], product_id=8)
+        update_deal(db, ids[0], product_category="rackets")
+        update_deal(db, ids[2], status="won", amount=90)
+        update_deal(db, ids[1], owner_id=2, created_at=datetime(2024, 5, 3))
+        update_deal(db, ids[4], client_id=1)
+        assert_matches_deals(db)
+
+        RollupService(db).remove_deals([ids[3]])
+        db.execute(text("DELETE FROM deals WHERE id = :id"), {"id": ids[3]})
+        assert_matches_deals(db)
+        # Emptied cells are removed rather than left at zero
+        assert db.execute(text("SELECT COUNT(*) FROM deal_daily_rollups WHERE deal_count <= 0")).scalar() == 0
+
+    def test_client_delete_detaches_deals(self, db):
+        insert_deals(
+            db,
+            {"client_id": 1, "status": "won", "product_category": "shoes", "amount": 100, "created_at": datetime(2024, 5, 1)},
+            {"client_id": 1, "status": "lost", "product_category": "balls", "amount": 10, "created_at": datetime(2024, 5, 4)},
+            {"client_id": 2, "status": "won", "product_category": "shoes", "amount": 40, "created_at": datetime(2024, 5, 1)}
+        )
+
+        # Same sequence as clients.delete_client
+        rollups = RollupService(db)
+        rollups.remove_client_deals(1)
+        detached = db.execute(
+            text("UPDATE deals SET client_id = NULL WHERE client_id = 1 RETURNING id")
+        ).scalars().all()
+        rollups.add_deals(detached)
+        db.execute(text("DELETE FROM clients WHERE id = 1"))
+
+        assert_matches_deals(db)
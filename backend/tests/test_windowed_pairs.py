@@ -0,0 +1,83 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from ..app.services.windowed_pairs import (
+    WonDeal, RepeatOrders, PairCombinations, CategoryRetention, sweep
+)
+
+WINDOW = timedelta(days=30)
+
+def make_deals(seed: int, clients: int = 20, per_client: int = 40):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    deals = []
+    for client_id in range(1, clients + 1):
+        sport = rng.choice(["running", "cycling", None])
+        for _ in range(rng.randint(0, per_client)):
+            deals.append(WonDeal(
+                client_id=client_id,
+                # Whole days so equal timestamps and window edges both occur
+                created_at=start + timedelta(days=rng.randint(0, 200)),
+                product_category=rng.choice(["protein", "creatine", "vitamins"]),
+                amount=float(rng.randint(1, 100)),
+                sport=sport
+            ))
+    deals.sort(key=lambda deal: (deal.client_id, deal.created_at))
+    return deals
+
+class TestWindowedPairs:
+    def test_repeat_orders_match_self_join(self):
+        deals = make_deals(1)
+        collector = RepeatOrders(WINDOW)
+        sweep(deals, collector)
+
+        expected = defaultdict(int)
+        for d1 in deals:
+            for d2 in deals:
+                if (d2.client_id == d1.client_id
+                        and d2.product_category == d1.product_category
+                        and d1.created_at < d2.created_at <= d1.created_at + WINDOW):
+                    expected[(d1.created_at.month, d1.product_category, d1.sport)] += 1
+
+        assert {k: v for k, v in collector.counts.items() if v} == dict(expected)
+
+    def test_pair_combinations_match_self_join(self):
+        deals = make_deals(2)
+        since = date(2024, 2, 1)
+        collector = PairCombinations(WINDOW, since=since)
+        sweep(deals, collector)
+
+        expected = defaultdict(lambda: [0, 0.0])
+        for i, d1 in enumerate(deals):
+            for d2 in deals[i + 1:]:
+                if (d2.client_id == d1.client_id
+                        and d1.created_at.date() >= since
+                        and d2.created_at <= d1.created_at + WINDOW):
+                    pair = expected[(d1.product_category, d2.product_category, d1.sport, d1.created_at.month)]
+                    pair[0] += 1
+                    pair[1] += d1.amount + d2.amount
+
+        assert set(collector.pairs) == set(expected)
+        for key, (count, amount) in expected.items():
+            assert collector.pairs[key][0] == count
+            assert abs(collector.pairs[key][1] - amount) < 1e-6
+
+    def test_category_retention_match_self_join(self):
+        deals = make_deals(3)
+        collector = CategoryRetention(timedelta(days=90))
+        sweep(deals, collector)
+
+        initial = defaultdict(set)
+        retained = defaultdict(set)
+        for d1 in deals:
+            initial[d1.product_category].add(d1.client_id)
+            for d2 in deals:
+                if (d2.client_id == d1.client_id
+                        and d2.product_category == d1.product_category
+                        and d1.created_at < d2.created_at <= d1.created_at + timedelta(days=90)):
+                    retained[d1.product_category].add(d1.client_id)
+
+        assert dict(collector.initial) == {k: len(v) for k, v in initial.items()}
+        assert {k: v for k, v in collector.retained.items() if v} == {
+            k: len(v) for k, v in retained.items()
+        }